@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Bulk slide benchmark: content slides filled from theflow_styles' paragraph templates against the
+same slides filled through python-pptx's paragraph, run and font proxies
+
+    python benchmarks/bulk_slides.py                      10,000 slides in decks of 20
+    python benchmarks/bulk_slides.py --slides 50000 --per-deck 15
+
+Both builders put the same lines, with the same styles, on the same 'Title and Content' slides,
+the way the per-lesson decks do; the run fails unless their slide XML is byte for byte the same.
+Decks are discarded once filled, so only the building is timed.
+"""
+
+import argparse
+import hashlib
+import itertools
+import os
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Lines of a lesson deck: a highlighted heading, bullets and a blank separator
+SAMPLE_LINES = [
+    "VOCABULÁRIO ESSENCIAL",
+    "• airport (noun) — aeroporto",
+    "• boarding pass (noun) — cartão de embarque",
+    "• to check in (verb) — fazer o check-in",
+    "",
+    "• Where is gate 12? — Onde fica o portão 12?",
+    "• My flight is delayed. — Meu voo está atrasado.",
+]
+
+
+def _proxy_fill(text_frame, lines, styles):
+    from theflow_styles import apply_style
+
+    # What add_lines did before the templates: one python-pptx paragraph and run per line
+    for i, line in enumerate(lines):
+        p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        p.text = line
+        properties = styles(line)
+        if properties is not None:
+            apply_style(p, properties)
+
+
+def _proxy_slide(prs, title, lines, styles):
+    from theflow_master import add_layout_slide
+
+    slide = add_layout_slide(prs, 'Title and Content')
+    slide.shapes.title.text_frame.text = title
+    _proxy_fill(slide.placeholders[1].text_frame, lines, styles)
+
+
+def _template_slide(prs, title, lines, styles):
+    from theflow_master import add_layout_slide, placeholder_frame
+    from theflow_styles import add_lines, set_text
+
+    slide = add_layout_slide(prs, 'Title and Content')
+    set_text(placeholder_frame(slide, 0), title)
+    add_lines(placeholder_frame(slide, 1), lines, styles)
+
+
+def run(build_slide, slides, per_deck):
+    """Build slides in decks of per_deck; return (seconds, digest of every slide's XML)"""
+    from lxml import etree
+
+    from deck_spec import DECK_COLORS
+    from theflow_deck import SLIDE_HEIGHT, SLIDE_WIDTH
+    from theflow_master import setup_master
+    from theflow_styles import text_style
+    from theflow_templates import new_presentation
+
+    heading = text_style('list_highlight', DECK_COLORS, size=20, color='accent')
+
+    def styles(line):
+        return heading if line.isupper() else None
+
+    lines = itertools.cycle(SAMPLE_LINES)
+    digest = hashlib.sha256()
+    elapsed = 0.0
+    for first in range(0, slides, per_deck):
+        count = min(per_deck, slides - first)
+        prs = new_presentation(SLIDE_WIDTH, SLIDE_HEIGHT, setup_master, (tuple(DECK_COLORS.items()),))
+        start = time.perf_counter()
+        for i in range(first, first + count):
+            build_slide(prs, f"LIÇÃO {i // per_deck + 1} ({i % per_deck + 1}/{count})",
+                        list(itertools.islice(lines, 7)), styles)
+        elapsed += time.perf_counter() - start
+        for slide in prs.slides:
+            digest.update(etree.tostring(slide._element))
+    return elapsed, digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--slides', type=int, default=10000,
+                        help='content slides per builder (default: 10000)')
+    parser.add_argument('--per-deck', type=int, default=20, help='slides per deck (default: 20)')
+    args = parser.parse_args(argv)
+    if args.slides < 1 or args.per_deck < 1:
+        parser.error('--slides and --per-deck must be at least 1')
+
+    # Warm the prepared master and the templates so neither builder pays for them
+    run(_template_slide, 1, 1)
+    results = {}
+    for name, build_slide in (('python-pptx proxies', _proxy_slide), ('templates', _template_slide)):
+        print(f"Building {args.slides} slides with {name}...")
+        results[name] = run(build_slide, args.slides, args.per_deck)
+
+    (proxy_s, proxy_digest), (template_s, template_digest) = results.values()
+    print("\n" + "="*60)
+    print(f"{args.slides} content slides in decks of {args.per_deck}")
+    print("="*60)
+    for name, (seconds, _) in results.items():
+        print(f"  {name:<22} {seconds:8.2f}s  {args.slides / seconds:8.0f} slides/s")
+    print(f"\nSpeedup: {proxy_s / template_s:.2f}x")
+    if proxy_digest != template_digest:
+        print("ERROR: the builders wrote different slide XML")
+        return 1
+    print("Slide XML is identical for both builders")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the image CDN, with configurable latency, for benchmarks
+
+Serves every IMAGE_URLS path: from the offline asset bundle when it has the image, otherwise a
+synthetic picture of the same name. Point the generators at it with THEFLOW_ASSET_MIRROR.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from theflow_assets import ASSET_BUNDLE_DIR, BUNDLE_MANIFEST, IMAGE_URLS  # noqa: E402
+
+DEFAULT_LATENCY_MS = 50
+
+# Size of the synthetic stand-in pictures, close to the CDN originals
+SYNTHETIC_SIZE = (1792, 1024)
+
+
+def synthetic_image(key, size=SYNTHETIC_SIZE):
+    """Return PNG bytes of a deterministic photo-like picture for an asset key"""
+    from PIL import Image
+
+    seed = hashlib.sha256(key.encode('utf-8')).digest()
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 40 + seed[0] % 40)
+    image = Image.merge('RGB', (gradient, noise, gradient.rotate(90 + seed[1] % 180).resize(size)))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def load_images(bundle_dir=ASSET_BUNDLE_DIR):
+    """Return ({url_path: bytes}, source) for every IMAGE_URLS key"""
+    try:
+        with open(os.path.join(bundle_dir, BUNDLE_MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    images, sources = {}, set()
+    for key, url in IMAGE_URLS.items():
+        entry = manifest.get(key)
+        if entry and entry['url'] == url:
+            with open(os.path.join(bundle_dir, entry['file']), 'rb') as f:
+                images[urlsplit(url).path] = f.read()
+            sources.add('bundle')
+        else:
+            images[urlsplit(url).path] = synthetic_image(key)
+            sources.add('synthetic')
+    return images, '+'.join(sorted(sources))
+
+
+class ImageServer(ThreadingHTTPServer):
+    """Serve fixed image bytes by path, sleeping latency seconds before each response"""
+
+    daemon_threads = True
+
+    def __init__(self, address, images, latency=DEFAULT_LATENCY_MS / 1000):
+        super().__init__(address, _Handler)
+        self.images = images
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = self.server.images.get(urlsplit(self.path).path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.requests += 1
+        self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f'delay before each response (default: {DEFAULT_LATENCY_MS})')
+    parser.add_argument('--bundle', default=ASSET_BUNDLE_DIR, help='asset bundle directory')
+    args = parser.parse_args(argv)
+
+    images, source = load_images(args.bundle)
+    server = ImageServer(('127.0.0.1', args.port), images, args.latency_ms / 1000)
+    print(f"Serving {len(images)} {source} images at {server.url} "
+          f"with {args.latency_ms:g} ms latency (THEFLOW_ASSET_MIRROR={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark child process: run one generator script, or render every slide and manual section on
+its own, and write the measurements to a JSON file
+
+    measure.py RESULT.json SCRIPT [ARGS...]     wall time and peak RSS of a whole script run
+    measure.py RESULT.json --parts REPEAT       median time and added bytes of each slide/section
+
+Runs in a fresh interpreter so peak RSS belongs to the measured work only. Peak RSS is the
+largest of this process and any worker process it waited for.
+"""
+
+import contextlib
+import io
+import json
+import os
+import resource
+import runpy
+import statistics
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+def peak_rss_kb():
+    """Largest resident set of this process or any finished child, in KiB"""
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def run_script(script, args):
+    """Run a generator script as __main__ and return its measurements"""
+    sys.argv = [script, *args]
+    start = time.perf_counter()
+    status = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            runpy.run_path(os.path.join(REPO_DIR, script), run_name='__main__')
+        except SystemExit as exc:
+            status = exc.code or 0
+    return {'wall_s': time.perf_counter() - start, 'peak_rss_kb': peak_rss_kb(), 'status': status}
+
+
+def _saved_size(document):
+    from theflow_zip import save_package
+
+    buffer = io.BytesIO()
+    save_package(document, buffer)
+    return buffer.tell()
+
+
+def _median_time(render, repeat):
+    times, size = [], None
+    for _ in range(repeat):
+        seconds, size = render()
+        times.append(seconds)
+    return statistics.median(times), size
+
+
+def measure_parts(repeat):
+    """Return {'slide/<label>' | 'section/<label>': measurements}, each part on an empty document"""
+    from deck_spec import DECK_COLORS, DECK_SLIDES
+    from manual_spec import MANUAL_SECTIONS
+    from theflow_assets import fetch_assets
+    from theflow_deck import deck_image_widths, render_presentation, render_slide
+    from theflow_images import merge_widths, optimize_images
+    from theflow_manual import manual_image_widths, render_block, render_manual, toc_items
+
+    widths = merge_widths(deck_image_widths(), manual_image_widths())
+    with contextlib.redirect_stdout(io.StringIO()):
+        image_files = optimize_images(fetch_assets(list(widths)), widths)
+    toc = toc_items()
+    empty_deck = _saved_size(render_presentation(image_files, []))
+    empty_manual = _saved_size(render_manual(image_files, []))
+
+    def render_deck_slide(slide):
+        prs = render_presentation(image_files, [])
+        start = time.perf_counter()
+        render_slide(prs, slide, image_files, DECK_COLORS)
+        return time.perf_counter() - start, _saved_size(prs) - empty_deck
+
+    def render_section(section):
+        doc = render_manual(image_files, [])
+        start = time.perf_counter()
+        for block in section['blocks']:
+            render_block(doc, block, image_files, toc)
+        return time.perf_counter() - start, _saved_size(doc) - empty_manual
+
+    results = {}
+    for kind, parts, render in (('slide', DECK_SLIDES, render_deck_slide),
+                                ('section', MANUAL_SECTIONS, render_section)):
+        for part in parts:
+            seconds, size = _median_time(lambda: render(part), repeat)
+            results[f"{kind}/{part['label']}"] = {'wall_s': seconds, 'bytes': size}
+    return results
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    result_path, rest = argv[0], argv[1:]
+    if rest[0] == '--parts':
+        result = {'parts': measure_parts(int(rest[1])), 'peak_rss_kb': peak_rss_kb()}
+    else:
+        result = run_script(rest[0], rest[1:])
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for The Flow document generators
+
+Serves the images from a local stand-in with simulated CDN latency (THEFLOW_ASSET_MIRROR) and runs
+every measurement in its own process with a fresh cache, so images are fetched and every part is
+rendered each time:
+
+    e2e/<script>        wall time and peak RSS of the whole script, median of --repeat runs
+    artifact/<file>     size of each document the scripts write
+    slide/<label>       render time and added bytes of one deck slide on an empty deck
+    section/<label>     the same for one manual section
+
+Results are compared with a stored baseline; a metric more than its tolerance above the baseline
+is reported as a regression and the exit status is 1. Baselines are machine specific, so record
+one on the machine that runs the comparison:
+
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from image_server import DEFAULT_LATENCY_MS, ImageServer, load_images
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Scripts run end to end, with the arguments that make every run do the full work
+SCRIPTS = [
+    ('create_theflow_documents.py', ['--full-rebuild']),
+    ('create_word_document.py', ['--full-rebuild']),
+]
+
+# Allowed growth over the baseline before a metric counts as a regression
+TOLERANCES = {'wall_s': 0.25, 'peak_rss_kb': 0.15, 'bytes': 0.05}
+# Differences smaller than these are noise, whatever the ratio
+NOISE_FLOOR = {'wall_s': 0.005, 'peak_rss_kb': 4096, 'bytes': 1024}
+
+
+def _measure(args, env):
+    with tempfile.TemporaryDirectory(prefix='theflow-bench-') as tmp:
+        result_path = os.path.join(tmp, 'result.json')
+        env = {**env, 'THEFLOW_CACHE_DIR': os.path.join(tmp, 'cache')}
+        output_dir = os.path.join(tmp, 'out')
+        os.makedirs(output_dir)
+        args = [a.replace('{output_dir}', output_dir) for a in args]
+        subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'measure.py'), result_path, *args],
+                       env=env, check=True)
+        with open(result_path, encoding='utf-8') as f:
+            result = json.load(f)
+        result['artifacts'] = {name: os.path.getsize(os.path.join(output_dir, name))
+                               for name in sorted(os.listdir(output_dir))}
+    return result
+
+
+def run_suite(env, repeat=3):
+    """Run every benchmark and return {name: {metric: value}}"""
+    results = {}
+    for script, args in SCRIPTS:
+        print(f"Benchmarking {script}...")
+        runs = []
+        for _ in range(repeat):
+            run = _measure([script, '--output-dir', '{output_dir}', *args], env)
+            if run['status'] != 0:
+                raise RuntimeError(f"{script} exited with status {run['status']}")
+            runs.append(run)
+        results[f"e2e/{script}"] = {
+            'wall_s': statistics.median(run['wall_s'] for run in runs),
+            'peak_rss_kb': max(run['peak_rss_kb'] for run in runs),
+        }
+        for name, size in runs[-1]['artifacts'].items():
+            results[f"artifact/{name}"] = {'bytes': size}
+
+    print("Benchmarking slides and sections...")
+    parts = _measure(['--parts', str(repeat)], env)
+    results.update(parts['parts'])
+    return results
+
+
+def compare(results, baseline):
+    """Return report lines and the number of regressions against baseline results"""
+    lines, regressions = [], 0
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline.get(name, {}).get(metric)
+            if before is None:
+                lines.append(f"  {name:<58} {metric:<12} {value:>12.4g}  (new)")
+                continue
+            change = (value - before) / before if before else 0.0
+            regressed = (change > TOLERANCES[metric]
+                         and value - before > NOISE_FLOOR[metric])
+            regressions += regressed
+            flag = '  REGRESSION' if regressed else ''
+            lines.append(f"  {name:<58} {metric:<12} {value:>12.4g} {change:>+8.1%}{flag}")
+    for name in sorted(set(baseline) - set(results)):
+        lines.append(f"  {name:<58} (missing from this run)")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark; times are medians (default: 3)')
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f'simulated CDN latency per request (default: {DEFAULT_LATENCY_MS})')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline results file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store this run as the baseline instead of comparing')
+    parser.add_argument('--output', help='also write this run\'s results to a JSON file')
+    args = parser.parse_args(argv)
+
+    images, source = load_images()
+    server = ImageServer(('127.0.0.1', 0), images, args.latency_ms / 1000).start()
+    env = {key: value for key, value in os.environ.items() if key != 'THEFLOW_OFFLINE'}
+    env['THEFLOW_ASSET_MIRROR'] = server.url
+    print(f"Serving {source} images at {server.url} with {args.latency_ms:g} ms latency\n")
+
+    start = time.perf_counter()
+    try:
+        results = run_suite(env, args.repeat)
+    finally:
+        server.shutdown()
+    run = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'images': source,
+            'latency_ms': args.latency_ms,
+            'repeat': args.repeat,
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'results': results,
+    }
+    print(f"\nSuite finished in {time.perf_counter() - start:.1f}s "
+          f"({server.requests} image requests, {server.bytes_sent // 1024} KB served)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+            f.write('\n')
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {'meta': {}, 'results': {}}
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+
+    lines, regressions = compare(results, baseline['results'])
+    print("\n" + "="*60)
+    print(f"Results vs baseline from {baseline['meta'].get('date', 'n/a')}")
+    print("="*60)
+    print("\n".join(lines))
+    print(f"\n{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script to generate the Word appendix covering every lesson in english_content.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_content import CONTENT_PATH, appendix_sections, load_content
+from theflow_docx_stream import StreamingDocument
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, start_trace
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu'
+APPENDIX_FILENAME = 'TheFlow_Apendice_Conteudo.docx'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--content', default=CONTENT_PATH, help='lesson corpus JSON file')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for the generated file')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of saved files, from 0 (store, fastest) to 9 (smallest) '
+                             f'(default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    filename = os.path.join(args.output_dir, APPENDIX_FILENAME)
+    print("\n=== Creating Word Content Appendix ===\n")
+    with StreamingDocument(filename) as doc:
+        doc.write_sections(appendix_sections(load_content(args.content)))
+
+    print("\n" + "="*60)
+    print("✓ CONTENT APPENDIX CREATED SUCCESSFULLY!")
+    print("="*60)
+    print(f"\nFile: {filename} ({doc.paragraphs} paragraphs, {time.perf_counter() - start:.2f}s)")
+    print("\nFile is ready for download.\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
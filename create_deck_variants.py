@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script to generate recolored and re-worded variants of the commercial deck from one base render
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_build import build_documents
+from theflow_deck import PPT_FILENAME, build_presentation, deck_image_widths
+from theflow_images import IMAGE_DPI
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, start_trace
+from theflow_variants import build_variants, load_variants
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('variants', help='JSON file with the variants (see theflow_variants.py)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for generated files')
+    parser.add_argument('--base', help='existing base deck to patch instead of rendering one')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='resolve images from the local asset bundle only')
+    parser.add_argument('--image-dpi', type=int, default=IMAGE_DPI,
+                        help=f'resample images to this many pixels per placed inch, 0 keeps the '
+                             f'originals (default: {IMAGE_DPI})')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of saved files, from 0 (store, fastest) to 9 (smallest) '
+                             f'(default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    try:
+        variants = load_variants(args.variants)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    base_path = args.base
+    if base_path is None:
+        jobs = [('PowerPoint', build_presentation, (os.path.join(args.output_dir, PPT_FILENAME),))]
+        [(_, base_path)] = build_documents(jobs, deck_image_widths(), offline=args.offline,
+                                           dpi=args.image_dpi)
+
+    start = time.perf_counter()
+    created = build_variants(base_path, variants, args.output_dir)
+
+    print("\n" + "="*60)
+    print(f"✓ {len(created)} DECK VARIANTS CREATED SUCCESSFULLY!")
+    print("="*60)
+    print(f"\nBase: {base_path}")
+    for variant_id, filename in created:
+        print(f"{variant_id}: {filename}")
+    print(f"\nVariant time: {time.perf_counter() - start:.2f}s\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script to generate one classroom slide deck per lesson in english_content.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_content import CONTENT_PATH, load_content
+from theflow_images import IMAGE_DPI
+from theflow_lesson_decks import build_lesson_decks
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, start_trace
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu/lesson_decks'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--content', default=CONTENT_PATH, help='lesson corpus JSON file')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for the decks')
+    parser.add_argument('--lessons', nargs='+', type=int, metavar='N',
+                        help='build only these lesson numbers')
+    parser.add_argument('--brands', help='brand profiles file (see theflow_brands.py)')
+    parser.add_argument('--brand', metavar='ID', help='brand id from --brands to apply')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--image-dpi', type=int, default=IMAGE_DPI,
+                        help=f'resample the brand logo to this many pixels per placed inch, 0 keeps '
+                             f'the original (default: {IMAGE_DPI})')
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help='render every slide instead of reusing cached parts')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of saved files, from 0 (store, fastest) to 9 (smallest) '
+                             f'(default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    brand = None
+    if args.brand:
+        if not args.brands:
+            parser.error("--brand needs --brands")
+        from theflow_brands import load_brands
+        try:
+            brands = {profile['id']: profile for profile in load_brands(args.brands)}
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        if args.brand not in brands:
+            parser.error(f"unknown brand id: {args.brand}")
+        brand = brands[args.brand]
+
+    content = load_content(args.content)
+    lessons = content['lessons']
+    if args.lessons:
+        unknown = sorted(set(args.lessons) - {lesson['lesson_number'] for lesson in lessons})
+        if unknown:
+            parser.error(f"unknown lesson numbers: {', '.join(map(str, unknown))}")
+        lessons = [lesson for lesson in lessons if lesson['lesson_number'] in args.lessons]
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    print("\n=== Creating Lesson Decks ===\n")
+    results = build_lesson_decks(lessons, content.get('review_sections', []), args.output_dir,
+                                 brand, args.jobs, args.image_dpi, not args.full_rebuild)
+
+    print("\n" + "="*60)
+    print(f"✓ {len(results)} LESSON DECKS CREATED SUCCESSFULLY!")
+    print("="*60)
+    print()
+    for label, filename, seconds in results:
+        print(f"{label}: {filename} ({seconds:.2f}s)")
+    print(f"\nTotal time: {time.perf_counter() - start:.2f}s\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script to generate one printable student workbook per lesson in english_content.json
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_content import CONTENT_PATH, load_content
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, start_trace
+from theflow_workbooks import build_workbooks
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu/workbooks'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--content', default=CONTENT_PATH, help='lesson corpus JSON file')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for the workbooks')
+    parser.add_argument('--lessons', nargs='+', type=int, metavar='N',
+                        help='build only these lesson numbers')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild every workbook even if its lesson is unchanged')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of saved files, from 0 (store, fastest) to 9 (smallest) '
+                             f'(default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    lessons = load_content(args.content)['lessons']
+    if args.lessons:
+        unknown = sorted(set(args.lessons) - {lesson['lesson_number'] for lesson in lessons})
+        if unknown:
+            parser.error(f"unknown lesson numbers: {', '.join(map(str, unknown))}")
+        lessons = [lesson for lesson in lessons if lesson['lesson_number'] in args.lessons]
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    print("\n=== Creating Lesson Workbooks ===\n")
+    built, skipped = build_workbooks(lessons, args.output_dir, args.jobs, args.force,
+                                     prune=not args.lessons)
+
+    print("\n" + "="*60)
+    print(f"✓ {len(built)} WORKBOOKS CREATED, {len(skipped)} UNCHANGED")
+    print("="*60)
+    print()
+    for key, filename, seconds in built:
+        print(f"Lesson {key}: {filename} ({seconds:.2f}s)")
+    print(f"\nTotal time: {time.perf_counter() - start:.2f}s\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script to generate PDF versions of the technical manual and the lesson content appendix
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_content import CONTENT_PATH, appendix_sections, load_content
+from theflow_images import IMAGE_DPI
+from theflow_manual import manual_image_widths
+from theflow_pdf import APPENDIX_PDF_FILENAME, MANUAL_PDF_FILENAME, build_pdf
+from theflow_render import prepare_images
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, span, start_trace
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--documents', nargs='+', choices=['manual', 'appendix'],
+                        default=['manual', 'appendix'], help='PDFs to build (default: both)')
+    parser.add_argument('--content', default=CONTENT_PATH, help='lesson corpus JSON file for the appendix')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for generated files')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='resolve images from the local asset bundle only')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes laying out chapters (default: one per CPU)')
+    parser.add_argument('--image-dpi', type=int, default=IMAGE_DPI,
+                        help=f'resample images to this many pixels per placed inch, 0 keeps the '
+                             f'originals (default: {IMAGE_DPI})')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of PDF content streams, from 0 (store, fastest) to 9 '
+                             f'(smallest) (default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    files = []
+    if 'manual' in args.documents:
+        print("Downloading images...")
+        with span('assets'):
+            image_files = prepare_images(manual_image_widths(), args.offline, args.image_dpi)
+        files.append(build_pdf(os.path.join(args.output_dir, MANUAL_PDF_FILENAME),
+                               'The Flow English Trainer - Manual Técnico Completo', image_files,
+                               max_workers=args.jobs))
+    if 'appendix' in args.documents:
+        try:
+            content = load_content(args.content)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        files.append(build_pdf(os.path.join(args.output_dir, APPENDIX_PDF_FILENAME),
+                               'The Flow English Trainer - Apêndice: Conteúdo das Lições', {},
+                               appendix_sections(content), args.jobs))
+
+    print("\n" + "="*60)
+    print("✓ PDF DOCUMENTS CREATED SUCCESSFULLY!")
+    print("="*60)
+    print("\nFiles:")
+    for filename in files:
+        print(f"  - {filename}")
+    print(f"\nTotal build time: {time.perf_counter() - start:.2f}s")
+    print("\nFiles are ready for download.\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script to generate white-label commercial decks for The Flow partner schools, one per brand profile
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from theflow_brands import build_brand_decks, load_brands
+from theflow_images import IMAGE_DPI
+from theflow_startup import startup_report
+from theflow_trace import finish_trace, start_trace
+from theflow_zip import DEFAULT_LEVEL, ZIP_LEVEL_ENV, set_deterministic, set_zip_level
+
+OUTPUT_DIR = '/home/ubuntu'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('brands', help='JSON file with the brand profiles (see theflow_brands.py)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for generated files')
+    parser.add_argument('--only', nargs='+', metavar='ID', help='build only these brand ids')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='resolve images from the local asset bundle only')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--image-dpi', type=int, default=IMAGE_DPI,
+                        help=f'resample images to this many pixels per placed inch, 0 keeps the '
+                             f'originals (default: {IMAGE_DPI})')
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help='render every slide instead of reusing cached parts')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help=f'deflate level of saved files, from 0 (store, fastest) to 9 (smallest) '
+                             f'(default: ${ZIP_LEVEL_ENV} or {DEFAULT_LEVEL})')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='reproducible output: date files at $SOURCE_DATE_EPOCH, or 1980-01-01 '
+                             'when unset, instead of the build time')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and startup timings when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write timing and memory spans to FILE (JSON lines) and a Chrome trace')
+    args = parser.parse_args(argv)
+    if args.trace:
+        start_trace(args.trace)
+    if args.zip_level is not None:
+        set_zip_level(args.zip_level)
+    if args.deterministic:
+        set_deterministic()
+
+    try:
+        brands = load_brands(args.brands)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    if args.only:
+        unknown = sorted(set(args.only) - {brand['id'] for brand in brands})
+        if unknown:
+            parser.error(f"unknown brand ids: {', '.join(unknown)}")
+        brands = [brand for brand in brands if brand['id'] in args.only]
+
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    results = build_brand_decks(brands, args.output_dir, offline=args.offline,
+                                max_workers=args.jobs, dpi=args.image_dpi,
+                                incremental=not args.full_rebuild)
+
+    print("\n" + "="*60)
+    print(f"✓ {len(results)} WHITE-LABEL DECKS CREATED SUCCESSFULLY!")
+    print("="*60)
+    print()
+    for brand_id, filename, seconds in results:
+        print(f"{brand_id}: {filename} ({seconds:.2f}s)")
+    print(f"\nTotal build time: {time.perf_counter() - start:.2f}s\n")
+
+    if args.trace:
+        print(finish_trace())
+    if args.startup_report:
+        print(startup_report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Declarative content of the commercial PowerPoint deck for The Flow English Trainer
+
+Each slide is a dict with a progress 'label', a 'kind' naming its builder in theflow_deck.py and
+that builder's inputs:
+
+    'cover'             background in the primary color, cover 'image', 'tagline', optional 'logo'
+    'title'             background in the primary color, 'title', optional 'subtitle' and 'logo'
+    'content'           'title' and bullet 'items', optional 'image' on the right and 'title_size'
+    'highlighted_list'  'title' and 'lines'; lines starting with 'highlight' prefixes are bold
+    'image'             'title' and one 'image' placed at 'left'/'top' with 'width'
+    'image_grid'        centered 'title' and 'images' as (asset_key, left, top), all 'width' wide
+    'closing'           background in the primary color, 'title' and 'contact' text
+
+Images are IMAGE_URLS keys; positions and sizes are in inches. Colors are referenced by role and
+resolved from DECK_COLORS. An optional 'slot' names the brand profile field that replaces the
+slide's lines in white-label decks (see theflow_brands.py).
+"""
+
+# Corporate colors (RGB; converted to python-pptx colors when used)
+BLUE_PRIMARY = (0, 51, 153)  # Deep blue
+RED_ACCENT = (178, 34, 52)   # American red
+WHITE = (255, 255, 255)
+GRAY_LIGHT = (240, 240, 240)
+
+DECK_COLORS = {
+    'primary': BLUE_PRIMARY,
+    'accent': RED_ACCENT,
+    'on_primary': WHITE,
+}
+
+DECK_SLIDES = [
+    # SLIDE 1 - CAPA
+    {
+        'label': 'Slide 1: Cover',
+        'kind': 'cover',
+        'image': 'cover',
+        'tagline': 'Potencializado por Inteligência Artificial',
+    },
+    # SLIDE 2 - O PROBLEMA
+    {
+        'label': 'Slide 2: The Problem',
+        'kind': 'content',
+        'title': 'O PROBLEMA',
+        'items': [
+            "• Dificuldade em praticar listening e speaking de forma efetiva",
+            "• Falta de feedback imediato e personalizado",
+            "• Métodos tradicionais são caros e inflexíveis",
+            "• Baixo engajamento e motivação dos alunos",
+            "• Acesso limitado a professores nativos qualificados"
+        ],
+    },
+    # SLIDE 3 - NOSSA SOLUÇÃO
+    {
+        'label': 'Slide 3: Our Solution',
+        'kind': 'content',
+        'title': 'NOSSA SOLUÇÃO',
+        'items': [
+            "✓ Plataforma completa com IA integrada de última geração",
+            "✓ Aprendizado gamificado e altamente interativo",
+            "✓ Feedback instantâneo e personalizado para cada aluno",
+            "✓ Disponível 24/7, em qualquer lugar do mundo",
+            "✓ Vozes americanas naturais e ultra-realistas",
+            "✓ Custo-benefício incomparável"
+        ],
+    },
+    # SLIDE 4 - FERRAMENTAS DE IA
+    {
+        'label': 'Slide 4: AI Tools',
+        'kind': 'highlighted_list',
+        'title': 'INTELIGÊNCIA ARTIFICIAL A SERVIÇO DO APRENDIZADO',
+        'title_size': 32,
+        'centered': True,
+        'top': 1.1,
+        'height': 4.2,
+        'word_wrap': True,
+        'lines': [
+            "1. TEXT-TO-SPEECH (TTS) DE ÚLTIMA GERAÇÃO",
+            "   • Google Cloud Neural Voice | OpenAI Text-to-Speech | ElevenLabs Ultra-realistic",
+            "   • Vozes americanas naturais e expressivas | Geração de áudio sob demanda",
+            "",
+            "2. ANÁLISE DE FALA COM IA",
+            "   • Transcrição automática | Análise de pronúncia | Feedback inteligente",
+            "",
+            "3. SSML (Speech Synthesis Markup Language)",
+            "   • Controle fino de entonação | Diálogos multi-voz realistas",
+            "",
+            "4. GAMIFICAÇÃO INTELIGENTE",
+            "   • Sistema adaptativo | Recomendações personalizadas | Análise de progresso"
+        ],
+        'highlight': ["1.", "2.", "3.", "4."],
+        'sizes': [16, 14],
+        'highlight_color': 'accent',
+    },
+    # SLIDE 5 - FUNCIONALIDADES PRINCIPAIS
+    {
+        'label': 'Slide 5: Main Features',
+        'kind': 'content',
+        'title': 'FUNCIONALIDADES PRINCIPAIS',
+        'items': [
+            "🎯 Aulas Estruturadas (Vocabulário, Gramática, Diálogos)",
+            "🎧 Exercícios de Listening com IA de última geração",
+            "🎤 Prática de Speaking com Feedback Automático",
+            "🏆 Desafios Gamificados para manter engajamento",
+            "📹 Vídeos Educativos Interativos",
+            "📊 Painel de Progresso Detalhado e Analytics"
+        ],
+    },
+    # SLIDE 6 - DIFERENCIAIS COMPETITIVOS
+    {
+        'label': 'Slide 6: Competitive Advantages',
+        'kind': 'content',
+        'title': 'DIFERENCIAIS COMPETITIVOS',
+        'items': [
+            "✦ IA de ponta para geração e análise de áudio (Google, OpenAI, ElevenLabs)",
+            "✦ Sistema de gamificação que mantém 80%+ de engajamento",
+            "✦ Painel administrativo completo para gestão de conteúdo",
+            "✦ Tecnologia web moderna e escalável (Next.js 14, PostgreSQL)",
+            "✦ Arquitetura cloud-native com AWS S3",
+            "✦ Custo-benefício 60% superior às plataformas tradicionais"
+        ],
+    },
+    # SLIDE 7 - ARQUITETURA TECNOLÓGICA
+    {
+        'label': 'Slide 7: Technology Architecture',
+        'kind': 'image',
+        'title': 'ARQUITETURA TECNOLÓGICA',
+        'image': 'architecture',
+        'left': 1.5,
+        'top': 1.2,
+        'width': 7,
+    },
+    # SLIDE 8 - CASOS DE USO
+    {
+        'label': 'Slide 8: Use Cases',
+        'kind': 'content',
+        'title': 'CASOS DE USO',
+        'items': [
+            "🏫 Escolas de idiomas (B2B) - Solução white-label completa",
+            "👨‍🏫 Professores particulares - Ferramenta de apoio ao ensino",
+            "🏢 Empresas com equipes internacionais - Treinamento corporativo",
+            "🎓 Estudantes autodidatas - Aprendizado independente",
+            "📝 Preparação para certificações (TOEFL, IELTS, Cambridge)"
+        ],
+    },
+    # SLIDE 9 - POTENCIAL DE CRESCIMENTO
+    {
+        'label': 'Slide 9: Growth Potential',
+        'kind': 'content',
+        'title': 'POTENCIAL DE CRESCIMENTO',
+        'items': [
+            "📈 Mercado global de e-learning: $325 bilhões em 2025",
+            "🌍 Aprendizado de idiomas online: crescimento de 18% ao ano",
+            "🤖 IA em educação: tendência dominante da década",
+            "🚀 Possibilidades de expansão:",
+            "   • Outros idiomas (Espanhol, Francês, Mandarim)",
+            "   • Modelo B2B e white-label para instituições",
+            "   • Certificações e parcerias acadêmicas"
+        ],
+    },
+    # SLIDE 10 - DEMONSTRAÇÃO
+    {
+        'label': 'Slide 10: Demonstration',
+        'kind': 'image_grid',
+        'title': 'DEMONSTRAÇÃO DA PLATAFORMA',
+        'images': [
+            ('dashboard', 0.5, 1.1),
+            ('listening', 5.2, 1.1),
+            ('speaking', 0.5, 3.5),
+            ('admin', 5.2, 3.5),
+        ],
+        'width': 4.5,
+    },
+    # SLIDE 11 - RESULTADOS ESPERADOS
+    {
+        'label': 'Slide 11: Expected Results',
+        'kind': 'content',
+        'title': 'RESULTADOS ESPERADOS',
+        'items': [
+            "⬆️ 80% de aumento no engajamento dos alunos",
+            "⚡ Feedback instantâneo vs. dias de espera (métodos tradicionais)",
+            "💰 Redução de 60% no custo vs. aulas presenciais",
+            "🎯 Aprendizado personalizado e adaptativo para cada aluno",
+            "📊 Métricas detalhadas de progresso e performance",
+            "🌟 Satisfação do aluno: 4.8/5.0 (projeção baseada em testes)"
+        ],
+    },
+    # SLIDE 12 - INVESTIMENTO E MODELO DE NEGÓCIO
+    {
+        'label': 'Slide 12: Business Model',
+        'kind': 'highlighted_list',
+        'title': 'INVESTIMENTO E MODELO DE NEGÓCIO',
+        'slot': 'pricing',
+        'lines': [
+            "MODELO SaaS (Software as a Service)",
+            "",
+            "💳 Planos Individuais:",
+            "   • Mensal: R$ 49,90 | Anual: R$ 499,00 (2 meses grátis)",
+            "",
+            "🏢 Licenciamento Institucional:",
+            "   • Escolas: a partir de R$ 2.500/mês (até 100 alunos)",
+            "   • Empresas: planos customizados",
+            "",
+            "🎨 White-label para Parceiros:",
+            "   • Solução completa com sua marca",
+            "",
+            "📊 ROI: Retorno do investimento em 12-18 meses"
+        ],
+        'highlight': ["MODELO", "💳", "🏢", "🎨", "📊"],
+        'sizes': [18, 16],
+    },
+    # SLIDE 13 - ROADMAP FUTURO
+    {
+        'label': 'Slide 13: Future Roadmap',
+        'kind': 'content',
+        'title': 'ROADMAP FUTURO',
+        'items': [
+            "Q1 2025: Expansão para Espanhol e Francês",
+            "Q2 2025: App mobile nativo (iOS/Android)",
+            "Q3 2025: Modo offline e sincronização",
+            "Q4 2025: Integração com plataformas LMS (Moodle, Canvas)",
+            "2026: IA conversacional avançada (chatbot tutor)",
+            "2026: Realidade Virtual para imersão total",
+            "2027: Expansão global e parcerias acadêmicas"
+        ],
+    },
+    # SLIDE 14 - CONTATO E PRÓXIMOS PASSOS
+    {
+        'label': 'Slide 14: Contact',
+        'kind': 'closing',
+        'title': 'PRONTO PARA REVOLUCIONAR O APRENDIZADO DE INGLÊS?',
+        'contact': "📧 contato@theflow.com\n🌐 www.theflow.com\n📱 +55 (11) 9999-9999\n\n✨ Solicite uma demonstração gratuita!",
+    },
+]
@@ -0,0 +1,41 @@
+"""
+The manual's section cache must be invalidated by a change to any of its renderer sources
+"""
+
+import os
+import shutil
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import theflow_manual  # noqa: E402
+from theflow_parts import MANUAL_SOURCES, PartCache  # noqa: E402
+
+SECTIONS = [{
+    'label': 'Tabela',
+    'blocks': [
+        ('heading', 'Tecnologias', 1),
+        ('table', ['Tecnologia', 'Descrição'], [['Python', 'Geração dos documentos']]),
+    ],
+}]
+
+
+def test_renderer_source_change_invalidates_sections(tmp_path, monkeypatch):
+    source_dir = tmp_path / 'src'
+    source_dir.mkdir()
+    for name in MANUAL_SOURCES:
+        shutil.copy(os.path.join(REPO_DIR, name), source_dir / name)
+    monkeypatch.setattr(theflow_manual, '__file__', str(source_dir / 'theflow_manual.py'))
+
+    def render():
+        cache = PartCache(root=str(tmp_path / 'parts'))
+        theflow_manual.render_manual({}, SECTIONS, cache)
+        return cache.hits
+
+    assert render() == 0
+    assert render() == 1
+
+    with open(source_dir / 'theflow_ooxml.py', 'a', encoding='utf-8') as f:
+        f.write('\n# table markup changed\n')
+    assert render() == 0
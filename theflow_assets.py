@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Shared asset fetch stage for The Flow document generators
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from theflow_startup import timed_import
+from theflow_trace import current_span, span
+
+# Image URLs from generation
+IMAGE_URLS = {
+    'cover': 'https://static.abacusaicdn.net/images/220f3bf0-e15b-44b4-9cf9-597ad6da9991.png',
+    'architecture': 'https://static.abacusaicdn.net/images/5454cf4a-9563-4601-b6e4-b97d314f2251.png',
+    'dashboard': 'https://static.abacusaicdn.net/images/e7130651-8b0a-412c-bf47-608360142b4b.png',
+    'listening': 'https://static.abacusaicdn.net/images/031c586f-5fa5-4dc2-bfb0-74706fa8ecaf.png',
+    'speaking': 'https://static.abacusaicdn.net/images/dcfaebf1-1273-480e-b30a-c336562179c6.png',
+    'admin': 'https://static.abacusaicdn.net/images/5d4d867f-6d93-4128-b067-c5e4b35d56d7.png'
+}
+
+# Persistent cache shared by every generator (override with THEFLOW_CACHE_DIR)
+CACHE_DIR = os.environ.get(
+    'THEFLOW_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'theflow')
+)
+ASSET_CACHE_MAX_BYTES = int(os.environ.get('THEFLOW_ASSET_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Local asset bundle for offline builds (written by `python theflow_assets.py prefetch`)
+ASSET_BUNDLE_DIR = os.environ.get(
+    'THEFLOW_ASSET_BUNDLE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asset_bundle')
+)
+BUNDLE_MANIFEST = 'manifest.json'
+
+# Base URL ("http://127.0.0.1:8765") that replaces the CDN's scheme and host when fetching, e.g.
+# for a local stand-in server in benchmarks (THEFLOW_ASSET_MIRROR)
+ASSET_MIRROR = os.environ.get('THEFLOW_ASSET_MIRROR', '')
+
+# (connect, read) timeouts in seconds, so a stalled CDN request fails instead of hanging
+FETCH_TIMEOUT = (5, 30)
+MAX_PARALLEL_DOWNLOADS = 6
+CHUNK_SIZE = 64 * 1024
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def asset_url(key, mirror=None):
+    """Return the URL an IMAGE_URLS key is fetched from, rewritten onto the mirror if one is set"""
+    url = IMAGE_URLS[key]
+    mirror = ASSET_MIRROR if mirror is None else mirror
+    if not mirror:
+        return url
+    parts = urlsplit(url)
+    return mirror.rstrip('/') + parts.path + (f'?{parts.query}' if parts.query else '')
+
+
+def offline_mode():
+    """True when THEFLOW_OFFLINE asks for a network-free build"""
+    return os.environ.get('THEFLOW_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+class AssetCache:
+    """Content-addressed asset store keyed by URL, revalidated with ETag/Last-Modified"""
+
+    def __init__(self, root=None, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.root = root or os.path.join(CACHE_DIR, 'assets')
+        self.blob_dir = os.path.join(self.root, 'blobs')
+        self.index_path = os.path.join(self.root, 'index.json')
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def blob_path(self, sha256, ext=''):
+        """Return the on-disk path for a content hash"""
+        return os.path.join(self.blob_dir, sha256[:2], sha256 + ext)
+
+    def lookup(self, url):
+        """Return the index entry for url if its blob is still on disk"""
+        with self._lock:
+            entry = self.index.get(url)
+        if entry and os.path.exists(self.blob_path(entry['sha256'], entry['ext'])):
+            return entry
+        return None
+
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url):
+        """Mark url as most recently used and return its blob path"""
+        with self._lock:
+            entry = self.index[url]
+            entry['last_used'] = time.time()
+        return self.blob_path(entry['sha256'], entry['ext'])
+
+    def store(self, url, response, tmp_file):
+        """Hash a downloaded temp file, move it into the store and index it"""
+        sha256 = file_sha256(tmp_file)
+        size = os.path.getsize(tmp_file)
+        ext = os.path.splitext(urlsplit(url).path)[1]
+        path = self.blob_path(sha256, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_file)
+        else:
+            os.replace(tmp_file, path)
+        with self._lock:
+            previous = self.index.get(url)
+            self.index[url] = {
+                'sha256': sha256,
+                'size': size,
+                'ext': ext,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'last_used': time.time(),
+            }
+            # A changed asset supersedes its old blob unless another URL still uses it
+            if previous is not None and (previous['sha256'], previous['ext']) != (sha256, ext):
+                self._remove_unused_blob((previous['sha256'], previous['ext']))
+        return path
+
+    def _remove_unused_blob(self, blob):
+        # Called with the lock held; True when the blob is unreferenced and now gone
+        if any((e['sha256'], e['ext']) == blob for e in self.index.values()):
+            return False
+        try:
+            os.remove(self.blob_path(*blob))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def evict(self, keep=()):
+        """Drop least recently used entries until the store fits in max_bytes
+
+        Blob files no entry refers to (left by an interrupted run) are deleted first.
+        """
+        with self._lock:
+            referenced = {self.blob_path(e['sha256'], e['ext']) for e in self.index.values()}
+            for dirpath, _, filenames in os.walk(self.blob_dir):
+                # Downloads in progress are .part files in blob_dir itself
+                if dirpath == self.blob_dir:
+                    continue
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if path not in referenced:
+                        try:
+                            os.remove(path)
+                        except FileNotFoundError:
+                            pass
+            blobs = {}
+            for entry in self.index.values():
+                blobs[entry['sha256'], entry['ext']] = entry['size']
+            total = sum(blobs.values())
+            for url, entry in sorted(self.index.items(), key=lambda item: item[1]['last_used']):
+                if total <= self.max_bytes:
+                    break
+                if url in keep:
+                    continue
+                del self.index[url]
+                blob = (entry['sha256'], entry['ext'])
+                if self._remove_unused_blob(blob):
+                    total -= blobs.pop(blob)
+
+    def save(self):
+        """Write the index atomically"""
+        with self._lock:
+            data = json.dumps(self.index, indent=2, sort_keys=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+
+def make_session(pool_size=MAX_PARALLEL_DOWNLOADS):
+    """Create a Session whose connection pool is shared by all download threads"""
+    timed_import('requests', 'requests.adapters')
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=2)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def fetch_asset(session, cache, url, timeout=FETCH_TIMEOUT):
+    """Return the cached path for url, downloading only when it changed upstream"""
+    import requests
+
+    entry = cache.lookup(url)
+    headers = cache.conditional_headers(entry) if entry else {}
+    try:
+        response = session.get(url, headers=headers, timeout=timeout, stream=True)
+    except requests.RequestException as exc:
+        if entry is None:
+            raise
+        print(f"Revalidation failed for {url} ({exc}), using cached copy")
+        return cache.touch(url), False
+
+    with response:
+        if response.status_code == 304:
+            if entry is None:
+                # Nothing was cached to be "not modified"; never store the empty body
+                raise requests.HTTPError(f"304 Not Modified for {url} without a cached copy",
+                                         response=response)
+            return cache.touch(url), False
+        response.raise_for_status()
+        fd, tmp_file = tempfile.mkstemp(dir=cache.blob_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+    return cache.store(url, response, tmp_file), True
+
+
+def _fetch_traced(session, cache, key, timeout, parent):
+    with span('fetch', key, parent=parent, url=asset_url(key)) as s:
+        path, downloaded = fetch_asset(session, cache, asset_url(key), timeout)
+        s.set(downloaded=downloaded, bytes=os.path.getsize(path))
+    return path, downloaded
+
+
+def load_bundle(keys=None, bundle_dir=None):
+    """Resolve IMAGE_URLS keys from the local bundle, verifying every file hash"""
+    bundle_dir = bundle_dir or ASSET_BUNDLE_DIR
+    keys = list(IMAGE_URLS if keys is None else keys)
+    manifest_path = os.path.join(bundle_dir, BUNDLE_MANIFEST)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"No asset bundle at {bundle_dir}; run `python theflow_assets.py prefetch` first"
+        ) from None
+
+    image_files = {}
+    for key in keys:
+        entry = manifest.get(key)
+        if entry is None or entry['url'] != IMAGE_URLS[key]:
+            raise RuntimeError(f"Asset bundle is missing or stale for '{key}'; re-run prefetch")
+        path = os.path.join(bundle_dir, entry['file'])
+        if not os.path.exists(path) or file_sha256(path) != entry['sha256']:
+            raise RuntimeError(f"Asset bundle file for '{key}' failed hash verification")
+        image_files[key] = path
+        print(f"Bundled {key} image")
+    return image_files
+
+
+def prefetch(keys=None, bundle_dir=None):
+    """Fetch assets and write them, with a hash manifest, into the local bundle"""
+    bundle_dir = bundle_dir or ASSET_BUNDLE_DIR
+    image_files = fetch_assets(keys, offline=False)
+    os.makedirs(bundle_dir, exist_ok=True)
+    manifest_path = os.path.join(bundle_dir, BUNDLE_MANIFEST)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    for key, path in image_files.items():
+        filename = key + os.path.splitext(path)[1]
+        shutil.copyfile(path, os.path.join(bundle_dir, filename))
+        manifest[key] = {
+            'url': IMAGE_URLS[key],
+            'file': filename,
+            'sha256': file_sha256(path),
+            'size': os.path.getsize(path),
+        }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"Asset bundle written to {bundle_dir}")
+    return manifest
+
+
+def fetch_assets(keys=None, max_workers=MAX_PARALLEL_DOWNLOADS, timeout=FETCH_TIMEOUT,
+                 cache=None, offline=None):
+    """Resolve the given IMAGE_URLS keys through the asset cache, concurrently"""
+    if offline is None:
+        offline = offline_mode()
+    if offline:
+        return load_bundle(keys)
+
+    keys = list(IMAGE_URLS if keys is None else keys)
+    cache = cache or AssetCache()
+    image_files = {}
+    with make_session(max_workers) as session, \
+            ThreadPoolExecutor(max_workers=min(max_workers, len(keys)) or 1) as pool:
+        parent = current_span()
+        futures = {
+            pool.submit(_fetch_traced, session, cache, key, timeout, parent): key for key in keys
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            image_files[key], downloaded = future.result()
+            print(f"{'Downloaded' if downloaded else 'Cached'} {key} image")
+    cache.evict(keep={asset_url(key) for key in keys})
+    cache.save()
+    return {key: image_files[key] for key in keys}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    prefetch_parser = subparsers.add_parser('prefetch', help='download assets into the offline bundle')
+    prefetch_parser.add_argument('keys', nargs='*', metavar='KEY',
+                                 help='IMAGE_URLS keys to bundle (default: all)')
+    prefetch_parser.add_argument('--bundle', default=ASSET_BUNDLE_DIR, help='bundle directory')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.keys) - set(IMAGE_URLS))
+    if unknown:
+        parser.error(f"unknown asset keys: {', '.join(unknown)}")
+
+    if args.command == 'prefetch':
+        prefetch(args.keys or None, args.bundle)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
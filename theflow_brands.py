@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+White-label brand profiles applied to the commercial deck, built in batches across a worker pool
+
+A brands file is a JSON list of profiles:
+
+    {
+        "id": "escola-alpha",                 file-name slug, required
+        "name": "Escola Alpha",               shown in progress output
+        "colors": {"primary": "#0B6E4F"},     any DECK_COLORS role, "#RRGGBB" or [r, g, b]
+        "logo": "logos/alpha.png",            local image placed on the cover (relative to the file)
+        "cover_image": "covers/alpha.png",    local image replacing the cover picture
+        "tagline": "...",                     cover tagline
+        "contact": "...",                     closing-slide contact block ("\\n" separates lines)
+        "pricing": ["...", ...],              replaces the lines of the slide whose 'slot' is 'pricing'
+        "pricing_highlight": ["...", ...]     line prefixes shown bold on that slide
+    }
+
+Every field but "id" is optional; anything left out keeps the standard deck.
+"""
+
+import copy
+import json
+import os
+import re
+
+from deck_spec import DECK_COLORS, DECK_SLIDES
+from theflow_assets import fetch_assets
+from theflow_build import run_jobs
+from theflow_deck import COVER_IMAGE_WIDTH, LOGO_WIDTH, deck_image_widths, render_presentation
+from theflow_images import IMAGE_DPI, optimize_image, optimize_images
+from theflow_parts import PartCache
+from theflow_startup import mark, timed_import
+from theflow_trace import span
+from theflow_zip import save_package
+
+BRAND_FILENAME = 'TheFlow_Apresentacao_Comercial_{id}.pptx'
+BRAND_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+BRAND_FIELDS = {
+    'id', 'name', 'colors', 'logo', 'cover_image', 'tagline', 'contact', 'pricing',
+    'pricing_highlight',
+}
+BRAND_TEXT_FIELDS = ('name', 'logo', 'cover_image', 'tagline', 'contact')
+BRAND_LIST_FIELDS = ('pricing', 'pricing_highlight')
+
+# Shared, already optimized media for the decks built by this worker (set by _init_worker)
+_WORKER_IMAGES = {}
+
+
+def parse_color(value):
+    """Convert "#RRGGBB" or [r, g, b] to an RGB tuple"""
+    if isinstance(value, str) and re.fullmatch(r'#?[0-9A-Fa-f]{6}', value):
+        value = value.lstrip('#')
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    if (isinstance(value, (list, tuple)) and len(value) == 3
+            and all(type(c) is int and 0 <= c <= 255 for c in value)):
+        return tuple(value)
+    raise ValueError(f"Invalid color {value!r}; use \"#RRGGBB\" or [r, g, b] with integers 0-255")
+
+
+def load_brands(path):
+    """Read and validate a brands file, resolving image paths relative to it"""
+    with open(path, encoding='utf-8') as f:
+        brands = json.load(f)
+    if not isinstance(brands, list):
+        raise ValueError(f"{path}: expected a JSON list of brand profiles")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    seen = set()
+    for i, brand in enumerate(brands):
+        where = f"{path}: brand #{i + 1}"
+        if not isinstance(brand, dict):
+            raise ValueError(f"{where}: expected a JSON object, got {type(brand).__name__}")
+        if not isinstance(brand.get('id'), str) or not BRAND_ID_PATTERN.match(brand['id']):
+            raise ValueError(f"{where}: 'id' must be a slug of letters, digits, '-' or '_'")
+        if brand['id'] in seen:
+            raise ValueError(f"{where}: duplicate id {brand['id']!r}")
+        seen.add(brand['id'])
+        where = f"{path}: brand {brand['id']!r}"
+        unknown = sorted(set(brand) - BRAND_FIELDS)
+        if unknown:
+            raise ValueError(f"{where}: unknown fields {', '.join(unknown)}")
+        for field in BRAND_TEXT_FIELDS:
+            if field in brand and not isinstance(brand[field], str):
+                raise ValueError(f"{where}: {field!r} must be a string")
+        for field in BRAND_LIST_FIELDS:
+            value = brand.get(field, [])
+            if not isinstance(value, list) or not all(isinstance(line, str) for line in value):
+                raise ValueError(f"{where}: {field!r} must be a list of strings")
+        if not isinstance(brand.get('colors', {}), dict):
+            raise ValueError(f"{where}: 'colors' must be an object of role: color")
+        unknown = sorted(set(brand.get('colors', {})) - set(DECK_COLORS))
+        if unknown:
+            raise ValueError(f"{where}: unknown color roles {', '.join(unknown)}")
+        colors = {}
+        for role, value in brand.get('colors', {}).items():
+            try:
+                colors[role] = parse_color(value)
+            except ValueError as e:
+                raise ValueError(f"{where}: colors.{role}: {e}") from None
+        brand['colors'] = colors
+        for field in ('logo', 'cover_image'):
+            if brand.get(field):
+                brand[field] = os.path.join(base_dir, brand[field])
+                if not os.path.exists(brand[field]):
+                    raise ValueError(f"{where}: {field} file not found: {brand[field]}")
+    return brands
+
+
+def brand_colors(brand):
+    """Return DECK_COLORS with the brand's overrides applied"""
+    return {**DECK_COLORS, **brand.get('colors', {})}
+
+
+def brand_slides(brand, slides=DECK_SLIDES):
+    """Return a copy of the deck spec with the brand's images and text swapped in"""
+    slides = copy.deepcopy(slides)
+    for slide in slides:
+        if slide['kind'] == 'cover':
+            if brand.get('cover_image'):
+                slide['image'] = 'brand_cover'
+            if brand.get('logo'):
+                slide['logo'] = 'brand_logo'
+            if 'tagline' in brand:
+                slide['tagline'] = brand['tagline']
+        elif slide['kind'] == 'closing' and 'contact' in brand:
+            slide['contact'] = brand['contact']
+        elif slide.get('slot') == 'pricing' and 'pricing' in brand:
+            slide['lines'] = brand['pricing']
+            if 'pricing_highlight' in brand:
+                slide['highlight'] = brand['pricing_highlight']
+    return slides
+
+
+def prepare_brand_images(brand, dpi=IMAGE_DPI):
+    """Return {'brand_logo' / 'brand_cover': optimized path} for the images a brand provides"""
+    brand_images = {}
+    for field, key, width in (('logo', 'brand_logo', LOGO_WIDTH),
+                              ('cover_image', 'brand_cover', COVER_IMAGE_WIDTH)):
+        if brand.get(field):
+            path = brand[field]
+            brand_images[key] = optimize_image(path, width, dpi) if dpi else path
+    return brand_images
+
+
+def _init_worker(image_files):
+    """Pool initializer: keep the shared media and load python-pptx once per worker"""
+    timed_import('pptx', 'pptx.util', 'pptx.enum.text', 'pptx.dml.color')
+    _WORKER_IMAGES.clear()
+    _WORKER_IMAGES.update(image_files)
+
+
+def build_brand_deck(brand, brand_images, filename, incremental=True):
+    """Build one partner's deck from the worker's shared media plus its own images"""
+    part_cache = PartCache(enabled=incremental)
+    with span('deck', f"deck for {brand.get('name', brand['id'])}", echo=True):
+        prs = render_presentation(
+            {**_WORKER_IMAGES, **brand_images}, brand_slides(brand), brand_colors(brand), part_cache
+        )
+        with span('save', filename):
+            save_package(prs, filename)
+    return filename
+
+
+def build_brand_decks(brands, output_dir, offline=None, max_workers=None, dpi=IMAGE_DPI,
+                      incremental=True):
+    """Fetch and optimize the shared media once, then build one deck per brand in a pool"""
+    print("Downloading images...")
+    widths = deck_image_widths()
+    with span('assets'):
+        image_files = fetch_assets(list(widths), offline=offline)
+        if dpi:
+            image_files = optimize_images(image_files, widths, dpi)
+
+    jobs = []
+    for brand in brands:
+        filename = os.path.join(output_dir, BRAND_FILENAME.format(id=brand['id']))
+        jobs.append((brand['id'], build_brand_deck,
+                     (brand, prepare_brand_images(brand, dpi), filename, incremental)))
+    mark('assets ready')
+
+    results = run_jobs(jobs, max_workers, initializer=_init_worker, initargs=(image_files,))
+    mark('documents built')
+    if incremental:
+        PartCache().prune()
+    return results
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Build orchestrator: one shared asset stage, then each document built in its own worker process
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from theflow_assets import fetch_assets
+from theflow_images import IMAGE_DPI, optimize_images
+from theflow_startup import IMPORT_TIMINGS, mark, merge_worker_imports
+from theflow_trace import current_span, span
+
+
+def _timed(label, builder, args, parent=None):
+    with span('job', label, parent=parent) as s:
+        result = builder(*args)
+    return result, s.seconds
+
+
+def _timed_in_worker(label, builder, args, parent):
+    # The worker's own import timings travel back with the result, for the startup report
+    return (*_timed(label, builder, args, parent), dict(IMPORT_TIMINGS))
+
+
+def run_jobs(jobs, max_workers=None, initializer=None, initargs=()):
+    """Run (label, builder, args) jobs in a process pool and return [(label, result, seconds)]
+
+    initializer(*initargs) runs once per worker, to load state shared by all of its jobs.
+    """
+    # Builders must be module-level functions so they pickle into the workers;
+    # a single job runs in-process and skips the pool start-up cost
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return [(label, *_timed(label, builder, args)) for label, builder, args in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        parent = current_span()
+        futures = [(label, pool.submit(_timed_in_worker, label, builder, args, parent))
+                   for label, builder, args in jobs]
+        results = []
+        for label, future in futures:
+            result, seconds, imports = future.result()
+            merge_worker_imports(imports)
+            results.append((label, result, seconds))
+        return results
+
+
+def build_documents(jobs, asset_widths, offline=None, max_workers=None, dpi=IMAGE_DPI):
+    """Fetch and optimize assets once, then call builder(image_files, *args) for every job
+
+    asset_widths maps each IMAGE_URLS key to its widest placement in inches; a dpi of 0 keeps
+    the original images.
+    """
+    start = time.perf_counter()
+    print("Downloading images...")
+    with span('assets'):
+        image_files = fetch_assets(list(asset_widths), offline=offline)
+        if dpi:
+            image_files = optimize_images(image_files, asset_widths, dpi)
+    mark('assets ready')
+
+    results = run_jobs(
+        [(label, builder, (image_files, *args)) for label, builder, args in jobs], max_workers
+    )
+    mark('documents built')
+    for label, _, seconds in results:
+        print(f"  {label}: {seconds:.2f}s")
+    print(f"  total build time: {time.perf_counter() - start:.2f}s")
+    return [(label, result) for label, result, _ in results]
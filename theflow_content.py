@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+The lesson corpus (english_content.json) and the appendix sections generated from it
+"""
+
+import json
+import os
+
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'english_content.json')
+
+VOCABULARY_HEADER = ['Palavra', 'Classe', 'Definição', 'Tradução']
+
+
+def load_content(path=CONTENT_PATH):
+    """Read the lesson corpus"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def vocabulary_rows(vocabulary):
+    """Table rows for vocabulary items, in VOCABULARY_HEADER order"""
+    return [
+        [item['word'], item.get('part_of_speech', ''), item.get('definition', ''),
+         item.get('translation_pt', '')]
+        for item in vocabulary
+    ]
+
+
+def lesson_blocks(lesson):
+    """Yield manual_spec blocks covering one lesson's vocabulary, phrases, sentences and dialogues"""
+    yield ('heading', f"Lição {lesson['lesson_number']}: {lesson['title']}", 1)
+    yield ('paragraph', f"Nível: {lesson.get('difficulty', '-')} | "
+                        f"Tópicos: {', '.join(lesson.get('topics', [])) or '-'}")
+    if lesson.get('vocabulary'):
+        yield ('heading', 'Vocabulário', 2)
+        yield ('table', VOCABULARY_HEADER, vocabulary_rows(lesson['vocabulary']), [2, 1.2, 4, 2.5])
+    if lesson.get('phrases'):
+        yield ('heading', 'Frases', 2)
+        yield ('table', ['Frase', 'Tradução', 'Contexto'], [
+            [item['phrase'], item.get('translation', ''), item.get('context', '')]
+            for item in lesson['phrases']
+        ], [3, 3, 2])
+    if lesson.get('example_sentences'):
+        yield ('heading', 'Exemplos', 2)
+        yield ('bullets', [
+            f"{item['sentence']} — {item.get('translation', '')}"
+            for item in lesson['example_sentences']
+        ])
+    if lesson.get('dialogues'):
+        yield ('heading', 'Diálogos', 2)
+        for dialogue in lesson['dialogues']:
+            yield ('bold_paragraph', dialogue.get('context', ''))
+            yield ('definitions', [(line['speaker'], line['text']) for line in dialogue['conversation']])
+
+
+def appendix_sections(content):
+    """Yield appendix sections: a cover, then one section per lesson"""
+    metadata = content.get('metadata', {})
+    yield {
+        'label': 'appendix cover',
+        'blocks': [
+            ('title', 'THE FLOW ENGLISH TRAINER'),
+            ('centered', 'APÊNDICE: CONTEÚDO DAS LIÇÕES', 18, True),
+            ('centered', metadata.get('source', ''), 14),
+            ('paragraph', ''),
+            ('centered', metadata.get('copyright', '')),
+        ],
+    }
+    for lesson in content['lessons']:
+        yield {'label': f"Lesson {lesson['lesson_number']}", 'blocks': lesson_blocks(lesson)}
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Render the declarative commercial deck (deck_spec.py) into a PowerPoint presentation
+"""
+
+import os
+
+from deck_spec import DECK_COLORS, DECK_SLIDES
+from theflow_images import merge_widths
+from theflow_master import (
+    CONTENT_IMAGE_WIDTH, COVER_IMAGE_WIDTH, LIST_BOX, LIST_LINE_SIZE, LOGO_WIDTH, SLIDE_TITLE_SIZE,
+    add_layout_slide, drop_placeholder, fill_picture, placeholder_frame, setup_master,
+)
+from theflow_parts import DECK_SOURCES, PartCache, fingerprint, renderer_digest
+from theflow_startup import timed_import
+from theflow_styles import add_lines, set_text, text_style
+from theflow_templates import new_presentation
+from theflow_trace import span
+from theflow_zip import save_package
+
+PPT_FILENAME = 'TheFlow_Apresentacao_Comercial.pptx'
+
+# 16:9 slide size in inches
+SLIDE_WIDTH = 10
+SLIDE_HEIGHT = 5.625
+
+
+def slide_image_widths(slide):
+    """Return {asset_key: placed width in inches} for one slide spec"""
+    kind = slide['kind']
+    if kind == 'image_grid':
+        return {key: slide['width'] for key, _, _ in slide['images']}
+    if kind == 'image':
+        return {slide['image']: slide['width']}
+    if kind == 'cover':
+        widths = {slide['image']: COVER_IMAGE_WIDTH}
+        if slide.get('logo'):
+            widths[slide['logo']] = LOGO_WIDTH
+        return widths
+    if kind == 'title':
+        return {slide['logo']: LOGO_WIDTH} if slide.get('logo') else {}
+    if slide.get('image'):
+        return {slide['image']: CONTENT_IMAGE_WIDTH}
+    return {}
+
+
+def slide_asset_keys(slide):
+    """Return the IMAGE_URLS keys placed by one slide spec"""
+    return list(slide_image_widths(slide))
+
+
+def deck_image_widths(slides=DECK_SLIDES):
+    """Return {asset_key: widest placement in inches} for the deck, in first-use order"""
+    return merge_widths(*(slide_image_widths(slide) for slide in slides))
+
+
+def deck_asset_keys(slides=DECK_SLIDES):
+    """Return the IMAGE_URLS keys placed by the deck, in first-use order"""
+    return list(deck_image_widths(slides))
+
+
+def _set_title(slide, title, size=SLIDE_TITLE_SIZE, centered=False):
+    properties = None
+    if size != SLIDE_TITLE_SIZE or centered:
+        # Only the size or alignment differs; the color still comes from the layout's title style
+        properties = text_style('slide_title', size=size, color=None,
+                                align='ctr' if centered else None)
+    set_text(placeholder_frame(slide, 0), title, properties)
+
+
+def add_title_slide(prs, title, subtitle="", logo_path=None):
+    """Add a title slide"""
+    slide = add_layout_slide(prs, 'Title')
+    set_text(placeholder_frame(slide, 0), title)
+    if subtitle:
+        set_text(placeholder_frame(slide, 1), subtitle)
+    else:
+        drop_placeholder(slide, 1)
+    if logo_path:
+        fill_picture(slide.placeholders[2], logo_path)
+    else:
+        drop_placeholder(slide, 2)
+    return slide
+
+
+def add_content_slide(prs, title, content_items, image_path=None, title_size=SLIDE_TITLE_SIZE):
+    """Add a content slide with bullet points"""
+    if image_path:
+        # Split layout: content on left, image on right
+        slide = add_layout_slide(prs, 'Title, Content and Picture')
+        fill_picture(slide.placeholders[2], image_path)
+    else:
+        slide = add_layout_slide(prs, 'Title and Content')
+    _set_title(slide, title, title_size)
+    add_lines(placeholder_frame(slide, 1), content_items)
+    return slide
+
+
+def add_cover_slide(prs, image_path, tagline, logo_path=None):
+    """Add the cover: full-width image over the primary color with a tagline below"""
+    slide = add_layout_slide(prs, 'Cover')
+    fill_picture(slide.placeholders[1], image_path)
+    set_text(placeholder_frame(slide, 2), tagline)
+    # Partner logo in the top-left corner (white-label decks)
+    if logo_path:
+        fill_picture(slide.placeholders[3], logo_path)
+    else:
+        drop_placeholder(slide, 3)
+    return slide
+
+
+def add_highlighted_list_slide(prs, title, lines, highlight, sizes, title_size=SLIDE_TITLE_SIZE,
+                               centered=False, top=1.2, height=4, word_wrap=False,
+                               highlight_color=None, colors=DECK_COLORS):
+    """Add a text slide whose lines starting with a highlight prefix are larger and bold"""
+    from pptx.util import Inches
+
+    slide = add_layout_slide(prs, 'Title and List')
+    _set_title(slide, title, title_size, centered)
+
+    body = slide.placeholders[1]
+    left, list_top, width, list_height = LIST_BOX
+    if (top, height) != (list_top, list_height):
+        body.left, body.top = Inches(left), Inches(top)
+        body.width, body.height = Inches(width), Inches(height)
+    text_frame = body.text_frame
+    if word_wrap:
+        text_frame.word_wrap = True
+
+    highlight_size, normal_size = sizes
+    highlighted = text_style('list_highlight', colors, size=highlight_size, color=highlight_color)
+    normal = None if normal_size == LIST_LINE_SIZE else text_style('list_line', colors, size=normal_size)
+    prefixes = tuple(highlight)
+    add_lines(text_frame, lines, lambda line: highlighted if line.startswith(prefixes) else normal)
+    return slide
+
+
+def add_image_slide(prs, title, image_path, left, top, width):
+    """Add a slide with a title and one picture"""
+    from pptx.util import Inches
+
+    slide = add_layout_slide(prs, 'Title Only')
+    _set_title(slide, title)
+    slide.shapes.add_picture(image_path, Inches(left), Inches(top), width=Inches(width))
+    return slide
+
+
+def add_image_grid_slide(prs, title, images, width):
+    """Add a slide with a centered title and a grid of (image_path, left, top) pictures"""
+    from pptx.util import Inches
+
+    slide = add_layout_slide(prs, 'Title Only')
+    _set_title(slide, title, centered=True)
+    for image_path, left, top in images:
+        slide.shapes.add_picture(image_path, Inches(left), Inches(top), width=Inches(width))
+    return slide
+
+
+def add_closing_slide(prs, title, contact):
+    """Add the closing call to action with the contact block"""
+    slide = add_layout_slide(prs, 'Closing')
+    set_text(placeholder_frame(slide, 0), title)
+    set_text(placeholder_frame(slide, 1), contact)
+    return slide
+
+
+def render_slide(prs, slide, image_files, colors=DECK_COLORS):
+    """Append one spec slide to prs, whose master is set up in colors
+
+    Backgrounds and text colors come from the master's layouts; colors only resolves the roles a
+    slide names itself, such as a highlighted list's highlight_color.
+    """
+    kind = slide['kind']
+    if kind == 'cover':
+        logo_path = image_files[slide['logo']] if slide.get('logo') else None
+        return add_cover_slide(prs, image_files[slide['image']], slide['tagline'], logo_path)
+    if kind == 'title':
+        logo_path = image_files[slide['logo']] if slide.get('logo') else None
+        return add_title_slide(prs, slide['title'], slide.get('subtitle', ''), logo_path)
+    if kind == 'content':
+        image_path = image_files[slide['image']] if slide.get('image') else None
+        return add_content_slide(prs, slide['title'], slide['items'], image_path,
+                                 slide.get('title_size', SLIDE_TITLE_SIZE))
+    if kind == 'highlighted_list':
+        options = {
+            key: value for key, value in slide.items() if key not in ('label', 'kind', 'slot')
+        }
+        return add_highlighted_list_slide(prs, colors=colors, **options)
+    if kind == 'image':
+        return add_image_slide(prs, slide['title'], image_files[slide['image']],
+                               slide['left'], slide['top'], slide['width'])
+    if kind == 'image_grid':
+        images = [(image_files[key], left, top) for key, left, top in slide['images']]
+        return add_image_grid_slide(prs, slide['title'], images, slide['width'])
+    if kind == 'closing':
+        return add_closing_slide(prs, slide['title'], slide['contact'])
+    raise ValueError(f"Unknown deck slide kind: {kind!r}")
+
+
+def capture_slide(prs, slide, image_files, keys):
+    """Serialize a rendered slide, mapping each picture relationship back to its asset key"""
+    from lxml import etree
+
+    images = {}
+    for key in keys:
+        # The image is already related to the slide, so this only looks up its rId
+        _, rId = slide.part.get_or_add_image_part(image_files[key])
+        images[rId] = key
+    return {
+        'layout': prs.slide_layouts.index(slide.slide_layout),
+        'xml': etree.tostring(slide._element, encoding='unicode'),
+        'images': images,
+    }
+
+
+def restore_slide(prs, entry, image_files):
+    """Append a slide rebuilt from a captured entry, relinking its pictures"""
+    from pptx.oxml import parse_xml
+    from pptx.oxml.ns import qn
+
+    slide = prs.slides.add_slide(prs.slide_layouts[entry['layout']])
+    cached = parse_xml(entry['xml'])
+    rIds = {
+        old: slide.part.get_or_add_image_part(image_files[key])[1]
+        for old, key in entry['images'].items()
+    }
+    for blip in cached.iter(qn('a:blip')):
+        embed = blip.get(qn('r:embed'))
+        if embed in rIds:
+            blip.set(qn('r:embed'), rIds[embed])
+
+    root = slide._element
+    for child in list(root):
+        root.remove(child)
+    root.extend(list(cached))
+    return slide
+
+
+def render_presentation(image_files, slides=DECK_SLIDES, colors=DECK_COLORS, part_cache=None):
+    """Render the spec slides into a new python-pptx Presentation, reusing cached slides"""
+    timed_import('pptx', 'pptx.util', 'pptx.enum.text', 'pptx.dml.color')
+    import pptx
+
+    part_cache = part_cache or PartCache(enabled=False)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    renderer = renderer_digest(*(os.path.join(base_dir, name) for name in DECK_SOURCES))
+    renderer += pptx.__version__
+
+    # Layouts carry the backgrounds and text styles, so the master is built per set of colors
+    prs = new_presentation(SLIDE_WIDTH, SLIDE_HEIGHT, setup_master, (tuple(colors.items()),))
+    for slide in slides:
+        with span('slide', slide['label'], echo=True, kind=slide['kind']) as s:
+            keys = slide_asset_keys(slide)
+            fp = fingerprint(renderer, [slide, colors], image_files, keys)
+            entry = part_cache.get(fp)
+            if entry is not None:
+                s.set(cached=True)
+                restore_slide(prs, entry, image_files)
+                continue
+            rendered = render_slide(prs, slide, image_files, colors)
+            part_cache.put(fp, capture_slide(prs, rendered, image_files, keys))
+    return prs
+
+
+def build_presentation(image_files, filename, incremental=True):
+    """Build the commercial deck and save it to filename"""
+    print("\n=== Creating PowerPoint Presentation ===\n")
+    part_cache = PartCache(enabled=incremental)
+    prs = render_presentation(image_files, part_cache=part_cache)
+    with span('save', filename):
+        save_package(prs, filename)
+    if incremental:
+        print(part_cache.summary('slides'))
+        part_cache.prune()
+    print(f"\n✓ PowerPoint created: {filename}\n")
+    return filename
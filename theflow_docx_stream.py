@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Streaming Word writer: paragraphs go straight into the zip instead of a python-docx tree
+
+The package skeleton (styles, numbering, settings, section properties) comes from a python-docx
+Document prepared with the manual's setup_styles, so streamed paragraphs use the same 'Normal',
+'Heading 1/2', 'List Bullet', 'Code' and 'Table Grid' styles as the manual. Blocks are the
+manual_spec tuples; 'image' and 'toc' need the full renderer and are not supported here.
+"""
+
+import io
+import itertools
+import os
+import zipfile
+
+from theflow_manual import BLUE_PRIMARY, WHITE, setup_styles
+from theflow_ooxml import (
+    column_widths, paragraph_xml, run_xml, table_rows_xml, table_start_xml, text_width_twips,
+)
+from theflow_templates import document_skeleton
+from theflow_trace import span
+from theflow_zip import CORE_PROPERTIES_PART, build_time, stamp_core_properties, zip_level
+
+DOCUMENT_PART = 'word/document.xml'
+
+# Streamed XML is handed to zlib in chunks of about this many characters
+FLUSH_CHARS = 256 * 1024
+TABLE_ROWS_PER_CHUNK = 1000
+
+
+class StreamingDocument:
+    """Write a .docx whose body is streamed, to a path or binary file; use as a context manager"""
+
+    def __init__(self, filename, setup=setup_styles):
+        skeleton, package = document_skeleton(setup)
+        self._style_ids = {}
+        self._styles = skeleton.styles
+        self.text_width = text_width_twips(skeleton)
+        self._skeleton = zipfile.ZipFile(io.BytesIO(package))
+
+        head, rest = self._skeleton.read(DOCUMENT_PART).split(b'<w:body>', 1)
+        self._tail = rest[rest.index(b'<w:sectPr'):]
+        level = zip_level()
+        self._zip = zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED,
+                                    compresslevel=level or None)
+        self._path = filename if isinstance(filename, (str, os.PathLike)) else None
+        self.filename = self._path or 'in-memory'
+        self.paragraphs = 0
+        self._when = build_time()
+
+        # Copy the skeleton up to the document part, which is then left open for streaming
+        remaining = self._skeleton.infolist()
+        while remaining[0].filename != DOCUMENT_PART:
+            self._copy(remaining.pop(0))
+        self._remaining = remaining[1:]
+        self._stream = self._zip.open(self._entry(DOCUMENT_PART), 'w')
+        self._buffer = [head.decode('utf-8'), '<w:body>']
+        self._buffered = 0
+
+    def _entry(self, name):
+        # Dated like save_package() entries, compressed as the zip file's own entries would be
+        info = zipfile.ZipInfo(name, self._when.timetuple()[:6])
+        info.compress_type = self._zip.compression
+        info._compresslevel = self._zip.compresslevel
+        return info
+
+    def _copy(self, info):
+        data = self._skeleton.read(info)
+        if info.filename == CORE_PROPERTIES_PART:
+            data = stamp_core_properties(data, self._when)
+        self._zip.writestr(self._entry(info.filename), data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def style_id(self, name):
+        """Resolve a style name such as 'List Bullet' to its id in styles.xml"""
+        if name not in self._style_ids:
+            self._style_ids[name] = self._styles[name].style_id
+        return self._style_ids[name]
+
+    def write_xml(self, xml):
+        """Append raw body XML"""
+        self._buffer.append(xml)
+        self._buffered += len(xml)
+        if self._buffered >= FLUSH_CHARS:
+            self._flush()
+
+    def _flush(self):
+        self._stream.write(''.join(self._buffer).encode('utf-8'))
+        self._buffer = []
+        self._buffered = 0
+
+    def add_paragraph(self, text='', style=None, bold=False, size=None, color=None,
+                      centered=False):
+        """Append a one-run paragraph"""
+        runs = run_xml(text, bold, size, color) if text else ''
+        self.paragraphs += 1
+        self.write_xml(paragraph_xml(runs, style and self.style_id(style), centered))
+
+    def add_runs(self, runs, style=None):
+        """Append a paragraph made of (text, bold) runs"""
+        self.paragraphs += 1
+        self.write_xml(paragraph_xml(
+            ''.join(run_xml(text, bold) for text, bold in runs), style and self.style_id(style)
+        ))
+
+    def add_table(self, header, rows, weights=None):
+        """Append a table with a repeating header row; rows may be a generator"""
+        # Rows are streamed in slices so a very long table never sits in memory as one string
+        rows = iter(rows)
+        widths = column_widths(self.text_width, weights, len(header))
+        self.write_xml(table_start_xml(header, widths, self.style_id('Table Grid'),
+                                       header_fill=BLUE_PRIMARY, header_color=WHITE))
+        while True:
+            chunk = list(itertools.islice(rows, TABLE_ROWS_PER_CHUNK))
+            if not chunk:
+                break
+            self.write_xml(table_rows_xml(chunk, widths))
+        self.write_xml('</w:tbl>')
+
+    def add_heading(self, text, level=1):
+        """Append a heading; level 0 is the document title"""
+        self.add_paragraph(text, 'Title' if level == 0 else f'Heading {level}')
+
+    def add_page_break(self):
+        """Append a paragraph holding a page break"""
+        self.write_xml('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    def write_block(self, block):
+        """Append one manual_spec block"""
+        kind = block[0]
+        if kind == 'title':
+            self.add_paragraph(block[1], 'Title', size=28, color=BLUE_PRIMARY, centered=True)
+        elif kind == 'centered':
+            text, size, bold = (block[1:] + (None, False))[:3]
+            self.add_paragraph(text, size=size, bold=bold, centered=True)
+        elif kind == 'heading':
+            self.add_heading(block[1], block[2])
+        elif kind == 'paragraph':
+            self.add_paragraph(*block[1:])
+        elif kind == 'bold_paragraph':
+            self.add_paragraph(block[1], bold=True)
+        elif kind == 'bullets':
+            for item in block[1]:
+                self.add_paragraph(item, 'List Bullet')
+        elif kind == 'bullet_group':
+            self.add_paragraph(block[1], 'List Bullet', bold=True)
+            for item in block[2]:
+                self.add_paragraph(item, 'List Bullet 2')
+        elif kind == 'definitions':
+            for term, definition in block[1]:
+                self.add_runs([(f'{term}: ', True), (definition, False)])
+        elif kind == 'code':
+            self.add_paragraph(block[1], 'Code')
+        elif kind == 'table':
+            self.add_table(*block[1:])
+        else:
+            raise ValueError(f"Manual block kind {kind!r} is not supported by the streaming writer")
+
+    def write_sections(self, sections):
+        """Append spec sections separated by page breaks; sections may be a generator"""
+        for i, section in enumerate(sections):
+            with span('section', section['label'], echo=True):
+                if i > 0:
+                    self.add_page_break()
+                for block in section['blocks']:
+                    self.write_block(block)
+
+    def close(self):
+        """Finish the body, copy the remaining skeleton parts and close the package"""
+        if self._zip is None:
+            return
+        with span('save', self.filename, paragraphs=self.paragraphs):
+            self._buffer.append(self._tail.decode('utf-8'))
+            self._flush()
+            self._stream.close()
+            for info in self._remaining:
+                self._copy(info)
+            self._zip.close()
+        self._skeleton.close()
+        self._zip = None
+
+    def abort(self):
+        """Give up on the package: no tail or central directory, and a file at a path is deleted"""
+        if self._zip is None:
+            return
+        try:
+            self._stream.close()
+            # Not writing the end records leaves nothing a reader would take for a document
+            self._zip._didModify = False
+            self._zip.close()
+        finally:
+            self._skeleton.close()
+            self._zip = None
+            if self._path is not None and os.path.exists(self._path):
+                os.remove(self._path)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Image optimization stage: resample each asset to the resolution its placement needs
+"""
+
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from theflow_assets import CACHE_DIR, file_sha256
+from theflow_startup import timed_import
+from theflow_trace import current_span, span
+
+# Pixels per inch of placed width; 150 is sharp on projectors and screens (THEFLOW_IMAGE_DPI)
+IMAGE_DPI = int(os.environ.get('THEFLOW_IMAGE_DPI', 150))
+JPEG_QUALITY = 85
+
+# Images with at most this many colors are flat graphics and stay PNG (palette)
+PALETTE_MAX_COLORS = 256
+
+# Bump when the encoding settings change so cached variants are regenerated
+OPTIMIZER_VERSION = 1
+OPTIMIZED_DIR = os.path.join(CACHE_DIR, 'optimized')
+MAX_PARALLEL_OPTIMIZE = 4
+
+
+def merge_widths(*width_maps):
+    """Combine {asset_key: width_inches} maps, keeping the widest placement of each image"""
+    merged = {}
+    for widths in width_maps:
+        for key, width in widths.items():
+            merged[key] = max(width, merged.get(key, 0))
+    return merged
+
+
+def _encode(image, path, fmt):
+    if fmt == 'JPEG':
+        image.convert('RGB').save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(path, 'PNG', optimize=True)
+
+
+def optimize_image(path, width_inches, dpi=IMAGE_DPI, cache_dir=None):
+    """Return a cached copy of path resampled to width_inches at dpi and re-encoded by content"""
+    timed_import('PIL.Image')
+    from PIL import Image
+
+    cache_dir = cache_dir or OPTIMIZED_DIR
+    target_px = math.ceil(width_inches * dpi)
+    key = hashlib.sha256(
+        f"{file_sha256(path)}:{target_px}:{OPTIMIZER_VERSION}".encode('ascii')
+    ).hexdigest()
+    # A kept source is cached under its own extension, so it is looked up too
+    source_ext = os.path.splitext(path)[1].lower()
+    for ext in dict.fromkeys(('.png', '.jpg', source_ext)):
+        cached = os.path.join(cache_dir, key[:2], key + ext)
+        if os.path.exists(cached):
+            return cached
+
+    with Image.open(path) as image:
+        image.load()
+        resized = image.width > target_px
+        if resized:
+            height = round(image.height * target_px / image.width)
+            image = image.resize((target_px, height), Image.LANCZOS)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        colors = image.getcolors(PALETTE_MAX_COLORS) if not has_alpha else None
+        if has_alpha:
+            fmt, ext = 'PNG', '.png'
+        elif colors is not None:
+            fmt, ext = 'PNG', '.png'
+            image = image.convert('P', palette=Image.ADAPTIVE, colors=len(colors))
+        else:
+            fmt, ext = 'JPEG', '.jpg'
+
+        target = os.path.join(cache_dir, key[:2], key + ext)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+        os.close(fd)
+        try:
+            _encode(image, tmp_path, fmt)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    # Re-encoding an image that needed no resampling can grow it; keep the source then, cached
+    # under the same key so later runs skip the decode and re-encode
+    if not resized and os.path.getsize(tmp_path) >= os.path.getsize(path):
+        shutil.copyfile(path, tmp_path)
+        target = os.path.join(cache_dir, key[:2], key + source_ext)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _optimize_traced(key, path, width_inches, dpi, parent):
+    with span('optimize', key, parent=parent, width_inches=width_inches, dpi=dpi) as s:
+        optimized = optimize_image(path, width_inches, dpi)
+        s.set(bytes_before=os.path.getsize(path), bytes_after=os.path.getsize(optimized))
+    return optimized
+
+
+def optimize_images(image_files, widths, dpi=IMAGE_DPI, max_workers=MAX_PARALLEL_OPTIMIZE):
+    """Optimize every fetched image for its widest placement, concurrently"""
+    # Pillow releases the GIL while resampling and encoding, so threads scale here
+    keys = [key for key in image_files if key in widths]
+    parent = current_span()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys)) or 1) as pool:
+        futures = {key: pool.submit(_optimize_traced, key, image_files[key], widths[key], dpi,
+                                    parent)
+                   for key in keys}
+        optimized = {key: future.result() for key, future in futures.items()}
+
+    for key in keys:
+        before, after = os.path.getsize(image_files[key]), os.path.getsize(optimized[key])
+        print(f"Optimized {key} image: {before // 1024} KB -> {after // 1024} KB")
+    return {key: optimized.get(key, path) for key, path in image_files.items()}
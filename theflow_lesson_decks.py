@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Classroom slide decks generated per lesson from english_content.json
+
+Each lesson becomes a title slide followed by vocabulary, phrase, dialogue and speaking slides
+and, after the last lesson a review covers, that review's highlights. Long lists are split
+across as many slides as they need. Slides are deck_spec dicts rendered by theflow_deck, so
+unchanged slides come from the part cache on nightly rebuilds.
+"""
+
+import os
+
+from deck_spec import DECK_COLORS
+from theflow_build import run_jobs
+from theflow_deck import LOGO_WIDTH, SLIDE_TITLE_SIZE, render_presentation
+from theflow_images import IMAGE_DPI, optimize_image
+from theflow_parts import PartCache
+from theflow_startup import mark, timed_import
+from theflow_trace import span
+from theflow_zip import save_package
+
+LESSON_DECK_FILENAME = 'TheFlow_Slides_Licao_{number:02d}{suffix}.pptx'
+
+# Lines that fit the 4in content box at 18pt, by list kind
+ITEMS_PER_SLIDE = 7
+DIALOGUE_LINES_PER_SLIDE = 6
+
+# The title box holds one line: its width in points (9in less the insets) over the average width
+# of a bold capital in ems. Longer titles are set smaller, down to MIN_TITLE_SIZE, then shortened.
+TITLE_WIDTH_PT = 634
+TITLE_CHAR_EMS = 0.62
+MIN_TITLE_SIZE = 20
+
+# Shared media and colors for the decks built by this worker (set by _init_worker)
+_WORKER = {'images': {}, 'colors': DECK_COLORS}
+
+
+def _title_chars(size):
+    return int(TITLE_WIDTH_PT / (TITLE_CHAR_EMS * size))
+
+
+def fit_title(title, suffix=''):
+    """Return (title + suffix, point size) fitting the title box, shortening title if need be"""
+    room = _title_chars(MIN_TITLE_SIZE) - len(suffix)
+    if len(title) > room:
+        title = title[:room - 1].rstrip() + '…'
+    title += suffix
+    size = SLIDE_TITLE_SIZE
+    while size > MIN_TITLE_SIZE and len(title) > _title_chars(size):
+        size -= 1
+    return title, size
+
+
+def paginate(title, items, per_slide, label):
+    """Split items into 'content' slides titled "TITLE (i/n)" when more than one is needed"""
+    pages = [items[i:i + per_slide] for i in range(0, len(items), per_slide)]
+    slides = []
+    for i, page in enumerate(pages, 1):
+        suffix = f" ({i}/{len(pages)})" if len(pages) > 1 else ''
+        page_title, size = fit_title(title, suffix)
+        slide = {
+            'label': f"{label}{suffix}",
+            'kind': 'content',
+            'title': page_title,
+            'items': page,
+        }
+        if size != SLIDE_TITLE_SIZE:
+            slide['title_size'] = size
+        slides.append(slide)
+    return slides
+
+
+def lesson_reviews(lesson, reviews):
+    """Return the review sections whose last covered lesson is this one"""
+    return [review for review in reviews
+            if review.get('lessons_covered') and max(review['lessons_covered']) == lesson['lesson_number']]
+
+
+def lesson_slides(lesson, reviews=(), logo=None):
+    """Return the deck_spec slides of one lesson's classroom deck"""
+    number = lesson['lesson_number']
+    slides = [{
+        'label': f"Lesson {number}: title",
+        'kind': 'title',
+        'title': f"LIÇÃO {number}",
+        'subtitle': lesson['title'],
+    }]
+    if logo:
+        slides[0]['logo'] = logo
+
+    if lesson.get('vocabulary'):
+        slides += paginate('VOCABULÁRIO', [
+            f"• {item['word']} ({item.get('part_of_speech', '-')}) — {item.get('translation_pt', '')}"
+            for item in lesson['vocabulary']
+        ], ITEMS_PER_SLIDE, f"Lesson {number}: vocabulary")
+    if lesson.get('phrases'):
+        slides += paginate('FRASES', [
+            f"• {item['phrase']} — {item.get('translation', '')}" for item in lesson['phrases']
+        ], ITEMS_PER_SLIDE, f"Lesson {number}: phrases")
+    for i, dialogue in enumerate(lesson.get('dialogues', []), 1):
+        slides += paginate(f"DIÁLOGO {i}: {dialogue.get('context', '').upper()}", [
+            f"{line['speaker']}: {line['text']}" for line in dialogue['conversation']
+        ], DIALOGUE_LINES_PER_SLIDE, f"Lesson {number}: dialogue {i}")
+    if lesson.get('speaking_prompts'):
+        slides += paginate('PRÁTICA ORAL', [
+            f"🎤 {prompt}" for prompt in lesson['speaking_prompts']
+        ], ITEMS_PER_SLIDE, f"Lesson {number}: speaking")
+    for review in lesson_reviews(lesson, reviews):
+        covered = ', '.join(str(n) for n in review['lessons_covered'])
+        slides += paginate(f"REVISÃO {review['review_number']} (LIÇÕES {covered})", [
+            f"✓ {highlight}" for highlight in review.get('key_highlights', [])
+        ], ITEMS_PER_SLIDE, f"Lesson {number}: review {review['review_number']}")
+    return slides
+
+
+def _init_worker(images, colors):
+    """Pool initializer: load python-pptx and keep the brand media and colors once per worker"""
+    timed_import('pptx', 'pptx.util', 'pptx.enum.text', 'pptx.dml.color')
+    _WORKER['images'] = images
+    _WORKER['colors'] = colors
+
+
+def build_lesson_deck(slides, filename, incremental=True):
+    """Render one lesson deck with the worker's media and colors"""
+    part_cache = PartCache(enabled=incremental)
+    prs = render_presentation(_WORKER['images'], slides, _WORKER['colors'], part_cache)
+    with span('save', filename):
+        save_package(prs, filename)
+    return filename
+
+
+def build_lesson_decks(lessons, reviews, output_dir, brand=None, max_workers=None,
+                       dpi=IMAGE_DPI, incremental=True):
+    """Build one classroom deck per lesson concurrently; brand is a theflow_brands profile"""
+    images, colors, suffix = {}, DECK_COLORS, ''
+    if brand is not None:
+        from theflow_brands import brand_colors
+        colors, suffix = brand_colors(brand), f"_{brand['id']}"
+        if brand.get('logo'):
+            images['brand_logo'] = optimize_image(brand['logo'], LOGO_WIDTH, dpi) if dpi else brand['logo']
+    mark('assets ready')
+
+    jobs = []
+    for lesson in lessons:
+        slides = lesson_slides(lesson, reviews, 'brand_logo' if images else None)
+        filename = os.path.join(output_dir, LESSON_DECK_FILENAME.format(
+            number=lesson['lesson_number'], suffix=suffix
+        ))
+        jobs.append((f"Lesson {lesson['lesson_number']}", build_lesson_deck,
+                     (slides, filename, incremental)))
+    results = run_jobs(jobs, max_workers, initializer=_init_worker, initargs=(images, colors))
+    mark('documents built')
+    if incremental:
+        PartCache().prune()
+    return results
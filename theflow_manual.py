@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Render the declarative technical manual (manual_spec.py) into a Word document
+"""
+
+import os
+
+from manual_spec import MANUAL_SECTIONS
+from theflow_images import merge_widths
+from theflow_ooxml import table_xml, text_width_twips
+from theflow_parts import MANUAL_SOURCES, PartCache, fingerprint, renderer_digest
+from theflow_startup import timed_import
+from theflow_templates import new_document
+from theflow_trace import span
+from theflow_zip import save_package
+
+# Corporate colors (RGB)
+BLUE_PRIMARY = (0, 51, 153)
+WHITE = (255, 255, 255)
+
+DOC_FILENAME = 'TheFlow_Manual_Tecnico_Completo.docx'
+
+# Paragraph styles set up once per document; blocks refer to them by name instead of formatting
+# each run. Sizes are in points.
+DOCUMENT_STYLES = {
+    'Normal': {'font': 'Calibri', 'size': 11},
+    'Heading 1': {'font': 'Calibri', 'size': 20, 'bold': True, 'color': BLUE_PRIMARY},
+    'Heading 2': {'font': 'Calibri', 'size': 16, 'bold': True, 'color': BLUE_PRIMARY},
+    'Code': {'font': 'Courier New', 'size': 9},
+}
+
+
+def section_asset_keys(section):
+    """Return the IMAGE_URLS keys placed by one section"""
+    return [block[1] for block in section['blocks'] if block[0] == 'image']
+
+
+def manual_image_widths(sections=MANUAL_SECTIONS):
+    """Return {asset_key: widest placement in inches} for the manual"""
+    return merge_widths(*(
+        {block[1]: block[2]} for section in sections for block in section['blocks']
+        if block[0] == 'image'
+    ))
+
+
+def manual_asset_keys(sections=MANUAL_SECTIONS):
+    """Return the IMAGE_URLS keys placed by the manual"""
+    return sorted({key for section in sections for key in section_asset_keys(section)})
+
+
+def toc_items(sections=MANUAL_SECTIONS):
+    """Return the numbered level-1 headings listed in the table of contents"""
+    return [
+        block[1] for section in sections for block in section['blocks']
+        if block[0] == 'heading' and block[2] == 1 and block[1][:1].isdigit()
+    ]
+
+
+def setup_styles(doc):
+    """Create the DOCUMENT_STYLES presets in doc, adding the styles it does not have"""
+    from docx.shared import Pt, RGBColor
+    from docx.enum.style import WD_STYLE_TYPE
+
+    styles = doc.styles
+    for name, preset in DOCUMENT_STYLES.items():
+        style = styles[name] if name in styles else styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        font = style.font
+        font.name = preset['font']
+        font.size = Pt(preset['size'])
+        if preset.get('bold'):
+            font.bold = True
+        if preset.get('color'):
+            font.color.rgb = RGBColor(*preset['color'])
+
+
+def _body_end(body):
+    """Index new blocks are inserted at: before the trailing sectPr, if any"""
+    sectPr = body.sectPr
+    return body.index(sectPr) if sectPr is not None else len(body)
+
+
+def add_table(doc, header, rows, weights=None):
+    """Append a table built as one XML fragment instead of cell by cell"""
+    from docx.oxml import parse_xml
+
+    tbl = parse_xml(table_xml(
+        header, rows, text_width_twips(doc), weights, doc.styles['Table Grid'].style_id,
+        header_fill=BLUE_PRIMARY, header_color=WHITE, namespace=True,
+    ))
+    body = doc.element.body
+    body.insert(_body_end(body), tbl)
+    return tbl
+
+
+def render_block(doc, block, image_files, toc):
+    """Append one spec block to doc"""
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    kind = block[0]
+    if kind == 'title':
+        title = doc.add_heading(block[1], 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        title.runs[0].font.size = Pt(28)
+        title.runs[0].font.color.rgb = RGBColor(*BLUE_PRIMARY)
+    elif kind == 'centered':
+        text, size, bold = (block[1:] + (None, False))[:3]
+        p = doc.add_paragraph(text)
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if size:
+            p.runs[0].font.size = Pt(size)
+        if bold:
+            p.runs[0].font.bold = True
+    elif kind == 'heading':
+        doc.add_heading(block[1], block[2])
+    elif kind == 'paragraph':
+        doc.add_paragraph(*block[1:])
+    elif kind == 'bold_paragraph':
+        doc.add_paragraph().add_run(block[1]).bold = True
+    elif kind == 'bullets':
+        for item in block[1]:
+            doc.add_paragraph(item, style='List Bullet')
+    elif kind == 'bullet_group':
+        doc.add_paragraph(block[1], style='List Bullet').runs[0].bold = True
+        for item in block[2]:
+            doc.add_paragraph(item, style='List Bullet 2')
+    elif kind == 'definitions':
+        for term, definition in block[1]:
+            p = doc.add_paragraph()
+            p.add_run(f'{term}: ').bold = True
+            p.add_run(definition)
+    elif kind == 'code':
+        doc.add_paragraph(block[1], style='Code')
+    elif kind == 'table':
+        add_table(doc, *block[1:])
+    elif kind == 'image':
+        doc.add_picture(image_files[block[1]], width=Inches(block[2]))
+    elif kind == 'toc':
+        for item in toc:
+            doc.add_paragraph(item, style='List Number')
+    else:
+        raise ValueError(f"Unknown manual block kind: {kind!r}")
+
+
+def capture_section(doc, start, image_files, keys):
+    """Serialize the body elements a section added, mapping pictures back to asset keys"""
+    from lxml import etree
+
+    body = doc.element.body
+    images = {}
+    for key in keys:
+        # The image is already related to the document, so this only looks up its rId
+        rId, _ = doc.part.get_or_add_image(image_files[key])
+        images[rId] = key
+    return {
+        'xml': [etree.tostring(el, encoding='unicode') for el in body[start:_body_end(body)]],
+        'images': images,
+    }
+
+
+def restore_section(doc, entry, image_files):
+    """Append a section's cached body elements, relinking pictures and renumbering shape ids"""
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+
+    rIds = {old: doc.part.get_or_add_image(image_files[key])[0] for old, key in entry['images'].items()}
+    next_id = doc.part.next_id
+    body = doc.element.body
+    for xml in entry['xml']:
+        el = parse_xml(xml)
+        for blip in el.iter(qn('a:blip')):
+            embed = blip.get(qn('r:embed'))
+            if embed in rIds:
+                blip.set(qn('r:embed'), rIds[embed])
+        for doc_pr in el.iter(qn('wp:docPr')):
+            doc_pr.set('id', str(next_id))
+            next_id += 1
+        body.insert(_body_end(body), el)
+
+
+def render_manual(image_files, sections=MANUAL_SECTIONS, part_cache=None):
+    """Render the manual sections into a new python-docx Document, reusing cached sections"""
+    timed_import('docx', 'docx.shared', 'docx.enum.text', 'docx.enum.style')
+    import docx
+
+    part_cache = part_cache or PartCache(enabled=False)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    renderer = renderer_digest(*(os.path.join(base_dir, name) for name in MANUAL_SOURCES))
+    renderer += docx.__version__
+
+    doc = new_document(setup_styles)
+    toc = toc_items(sections)
+    body = doc.element.body
+    for i, section in enumerate(sections):
+        if i > 0:
+            doc.add_page_break()
+        with span('section', section['label'], echo=True) as s:
+            keys = section_asset_keys(section)
+            uses_toc = any(block[0] == 'toc' for block in section['blocks'])
+            fp = fingerprint(renderer, [section, toc if uses_toc else None], image_files, keys)
+            entry = part_cache.get(fp)
+            if entry is not None:
+                s.set(cached=True)
+                restore_section(doc, entry, image_files)
+                continue
+            start = _body_end(body)
+            for block in section['blocks']:
+                render_block(doc, block, image_files, toc)
+            part_cache.put(fp, capture_section(doc, start, image_files, keys))
+    return doc
+
+
+def build_manual(image_files, filename, incremental=True):
+    """Build the Word technical manual and save it to filename"""
+    print("\n=== Creating Word Technical Manual ===\n")
+    part_cache = PartCache(enabled=incremental)
+    doc = render_manual(image_files, part_cache=part_cache)
+    with span('save', filename):
+        save_package(doc, filename)
+    if incremental:
+        print(part_cache.summary('sections'))
+        part_cache.prune()
+    print(f"\n✓ Word document created: {filename}\n")
+    return filename
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Branded slide master: the deck's slide layouts with real title, body and picture placeholders
+
+Instead of styling blank slides shape by shape, the layouts below carry the background, the
+geometry and the text styles (as the first list level of each placeholder, see theflow_styles.py).
+setup_master() writes them into a presentation once per set of colors and theflow_templates keeps
+the result, so every slide only fills its placeholders and inherits the rest.
+"""
+
+import copy
+
+from deck_spec import DECK_COLORS
+from theflow_styles import placeholder_style
+
+P_NAMESPACE = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+A_NAMESPACE = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+R_NAMESPACE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+EMU_PER_INCH = 914400
+_PLACEHOLDER_PATH = f'{{{P_NAMESPACE}}}nvSpPr/{{{P_NAMESPACE}}}nvPr/{{{P_NAMESPACE}}}ph'
+
+# Placed widths, in inches, of the pictures whose size is fixed by the layouts
+COVER_IMAGE_WIDTH = 8
+CONTENT_IMAGE_WIDTH = 4
+LOGO_WIDTH = 1.5
+
+TITLE_BOX = (0.5, 0.3, 9, 0.6)
+LIST_BOX = (0.5, 1.2, 9, 4)
+LOGO_BOX = (0.2, 0.2, LOGO_WIDTH, LOGO_WIDTH)
+SLIDE_TITLE_SIZE = 36
+LIST_LINE_SIZE = 16
+
+# Layouts by name, in master order: a background color role and placeholders as
+# (type, idx, name, (left, top, width, height) in inches, TEXT_STYLES name, style overrides).
+# Pictures are scaled to their placeholder's width rather than cropped to its box.
+SLIDE_LAYOUTS = {
+    'Cover': {'background': 'primary', 'placeholders': [
+        ('pic', 1, 'Cover Picture', (1, 0.5, COVER_IMAGE_WIDTH, 4.2), None, {}),
+        ('body', 2, 'Tagline', (0.5, 4.8, 9, 0.5), 'tagline', {}),
+        ('pic', 3, 'Logo', LOGO_BOX, None, {}),
+    ]},
+    'Title': {'background': 'primary', 'placeholders': [
+        ('title', 0, 'Title', (0.5, 1.5, 9, 1), 'cover_title', {}),
+        ('subTitle', 1, 'Subtitle', (0.5, 3, 9, 0.8), 'cover_subtitle', {}),
+        ('pic', 2, 'Logo', LOGO_BOX, None, {}),
+    ]},
+    'Title and Content': {'placeholders': [
+        ('title', 0, 'Title', TITLE_BOX, 'slide_title', {}),
+        ('body', 1, 'Content', LIST_BOX, 'bullet', {'wrap': True}),
+    ]},
+    'Title, Content and Picture': {'placeholders': [
+        ('title', 0, 'Title', TITLE_BOX, 'slide_title', {}),
+        ('body', 1, 'Content', (0.5, 1.2, 4.5, 4), 'bullet', {'wrap': True}),
+        ('pic', 2, 'Picture', (5.5, 1.2, CONTENT_IMAGE_WIDTH, 4), None, {}),
+    ]},
+    'Title and List': {'placeholders': [
+        ('title', 0, 'Title', TITLE_BOX, 'slide_title', {}),
+        ('body', 1, 'List', LIST_BOX, 'list_line', {'size': LIST_LINE_SIZE}),
+    ]},
+    'Title Only': {'placeholders': [
+        ('title', 0, 'Title', TITLE_BOX, 'slide_title', {}),
+    ]},
+    'Closing': {'background': 'primary', 'placeholders': [
+        ('title', 0, 'Title', (0.5, 1.5, 9, 1), 'closing_title', {}),
+        ('body', 1, 'Contact', (2, 3, 6, 2), 'tagline', {}),
+    ]},
+}
+LAYOUT_INDEX = {name: i for i, name in enumerate(SLIDE_LAYOUTS)}
+
+# The empty placeholders a new slide on each layout starts with, kept for the life of the process
+_SLIDE_PLACEHOLDERS = {}
+
+
+def _emu(inches):
+    return round(inches * EMU_PER_INCH)
+
+
+def _placeholder_xml(shape_id, ph_type, idx, name, box, style, overrides, colors):
+    ph = f'<p:ph type="{ph_type}"/>' if ph_type == 'title' else f'<p:ph type="{ph_type}" idx="{idx}"/>'
+    left, top, width, height = (_emu(value) for value in box)
+    if style:
+        body, lst_style = placeholder_style(style, colors, **overrides)
+    else:
+        body, lst_style = '<a:bodyPr/>', '<a:lstStyle/>'
+    return (
+        f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/>'
+        f'<p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr>{ph}</p:nvPr></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>'
+        f'<p:txBody>{body}{lst_style}<a:p><a:endParaRPr lang="en-US"/></a:p></p:txBody></p:sp>'
+    )
+
+
+def layout_xml(name, colors=DECK_COLORS):
+    """Return the p:sldLayout XML of one SLIDE_LAYOUTS entry in the given colors"""
+    layout = SLIDE_LAYOUTS[name]
+    background = ''
+    if layout.get('background'):
+        background = ('<p:bg><p:bgPr><a:solidFill><a:srgbClr val="%02X%02X%02X"/></a:solidFill>'
+                      '<a:effectLst/></p:bgPr></p:bg>' % colors[layout['background']])
+    shapes = ''.join(_placeholder_xml(i, *placeholder, colors)
+                     for i, placeholder in enumerate(layout['placeholders'], 2))
+    return (
+        f'<p:sldLayout xmlns:a="{A_NAMESPACE}" xmlns:r="{R_NAMESPACE}" xmlns:p="{P_NAMESPACE}" '
+        f'preserve="1" userDrawn="1"><p:cSld name="{name}">{background}<p:spTree>'
+        f'<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+        f'{shapes}</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>'
+    )
+
+
+def setup_master(prs, colors=tuple(DECK_COLORS.items())):
+    """Replace prs's slide layouts with SLIDE_LAYOUTS; colors are (role, rgb) pairs"""
+    from pptx.oxml import parse_xml
+
+    colors = dict(colors)
+    layouts = list(prs.slide_layouts)
+    for layout, name in zip(layouts, SLIDE_LAYOUTS):
+        new = parse_xml(layout_xml(name, colors))
+        root = layout._element
+        root.attrib.clear()
+        root.attrib.update(new.attrib)
+        for child in list(root):
+            root.remove(child)
+        root.extend(list(new))
+    # Not slide_layouts.remove(): its in-use check caches the presentation's slide list, which
+    # the deep copies made by theflow_templates would then no longer share with their XML
+    master = prs.slide_master
+    id_list = master._element.sldLayoutIdLst
+    for layout_id in id_list.sldLayoutId_lst[len(SLIDE_LAYOUTS):]:
+        id_list.remove(layout_id)
+        master.part.drop_rel(layout_id.rId)
+
+
+def add_layout_slide(prs, name):
+    """Append a slide on one of the SLIDE_LAYOUTS"""
+    layout = prs.slide_layouts[LAYOUT_INDEX[name]]
+    if name not in _SLIDE_PLACEHOLDERS:
+        slide = prs.slides.add_slide(layout)
+        _SLIDE_PLACEHOLDERS[name] = [copy.deepcopy(sp) for sp in slide.shapes._spTree.iter_shape_elms()]
+        return slide
+    # slides.add_slide() would rebuild the same placeholders through python-pptx every time
+    rId, slide = prs.part.add_slide(layout)
+    slide.shapes._spTree.extend(copy.deepcopy(sp) for sp in _SLIDE_PLACEHOLDERS[name])
+    prs.slides._sldIdLst.add_sldId(rId)
+    return slide
+
+
+def _placeholder(slide, idx):
+    # A direct lookup: slide.placeholders[idx] builds a proxy for, and runs several XPath queries
+    # on, every shape it passes
+    for sp in slide._element.cSld.spTree.iterchildren(f'{{{P_NAMESPACE}}}sp'):
+        ph = sp.find(_PLACEHOLDER_PATH)
+        if ph is not None and int(ph.get('idx', '0')) == idx:
+            return sp
+    raise KeyError(f"slide has no placeholder {idx}")
+
+
+def placeholder_frame(slide, idx):
+    """Return the text frame of a slide's placeholder idx (the title's is 0)"""
+    from pptx.text.text import TextFrame
+
+    return TextFrame(_placeholder(slide, idx).txBody, None)
+
+
+def fill_picture(placeholder, image_path, width=None):
+    """Put an image in a picture placeholder, scaled to width inches (default: the placeholder's)"""
+    from pptx.util import Inches
+
+    left, top = placeholder.left, placeholder.top
+    width = Inches(width) if width else placeholder.width
+    picture = placeholder.insert_picture(image_path)
+    # insert_picture crops the image to the placeholder's box; show all of it instead
+    blip_fill = picture._element.blipFill
+    if blip_fill.srcRect is not None:
+        blip_fill.remove(blip_fill.srcRect)
+    pixels_wide, pixels_high = picture.image.size
+    picture.left, picture.top = left, top
+    picture.width, picture.height = width, round(width * pixels_high / pixels_wide)
+    return picture
+
+
+def drop_placeholder(slide, idx):
+    """Remove a placeholder the slide does not use, e.g. the logo of an unbranded deck"""
+    element = _placeholder(slide, idx)
+    element.getparent().remove(element)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+WordprocessingML fragments (runs, paragraphs, tables) built as strings in one pass
+"""
+
+from xml.sax.saxutils import escape
+
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+# EMU per twip (python-docx lengths are EMU, table widths are twentieths of a point)
+EMU_PER_TWIP = 635
+
+
+def _hex(rgb):
+    return '%02X%02X%02X' % tuple(rgb)
+
+
+def _text_xml(text):
+    """w:t/w:br/w:tab run content for text, as python-docx's run.text setter would write it"""
+    parts = []
+    for i, line in enumerate(text.replace('\r\n', '\n').replace('\r', '\n').split('\n')):
+        if i:
+            parts.append('<w:br/>')
+        for j, chunk in enumerate(line.split('\t')):
+            if j:
+                parts.append('<w:tab/>')
+            if chunk:
+                space = ' xml:space="preserve"' if chunk != chunk.strip() else ''
+                parts.append(f'<w:t{space}>{escape(chunk)}</w:t>')
+    return ''.join(parts)
+
+
+def run_xml(text, bold=False, size=None, color=None):
+    """One w:r element"""
+    props = ''
+    if bold:
+        props += '<w:b/>'
+    if color:
+        props += f'<w:color w:val="{_hex(color)}"/>'
+    if size:
+        props += f'<w:sz w:val="{size * 2}"/>'
+    if props:
+        props = f'<w:rPr>{props}</w:rPr>'
+    return f'<w:r>{props}{_text_xml(text)}</w:r>'
+
+
+def paragraph_xml(runs, style_id=None, centered=False):
+    """One w:p element from already-built run XML"""
+    props = ''
+    if style_id:
+        props += f'<w:pPr><w:pStyle w:val="{style_id}"/>'
+    if centered:
+        props += '<w:jc w:val="center"/>' if props else '<w:pPr><w:jc w:val="center"/>'
+    if props:
+        props += '</w:pPr>'
+    if not props and not runs:
+        return '<w:p/>'
+    return f'<w:p>{props}{runs}</w:p>'
+
+
+def text_width_twips(doc):
+    """Width between the margins of a python-docx Document's first section, in twips"""
+    section = doc.sections[0]
+    return (section.page_width - section.left_margin - section.right_margin) // EMU_PER_TWIP
+
+
+def _cell_props(width, fill=None):
+    shading = f'<w:shd w:val="clear" w:color="auto" w:fill="{_hex(fill)}"/>' if fill else ''
+    return f'<w:tcPr><w:tcW w:w="{width}" w:type="dxa"/>{shading}</w:tcPr>'
+
+
+def column_widths(total_width, weights=None, columns=None):
+    """Split total_width (twips) across columns by relative weights (equal by default)"""
+    weights = weights or [1] * columns
+    return [int(total_width * weight / sum(weights)) for weight in weights]
+
+
+def table_start_xml(header, widths, style_id=None, header_fill=None, header_color=None,
+                    namespace=False):
+    """Opening w:tbl with its properties, grid and repeating bold header row"""
+    ns = f' xmlns:w="{W_NAMESPACE}"' if namespace else ''
+    style = f'<w:tblStyle w:val="{style_id}"/>' if style_id else ''
+    head_cells = ''.join(
+        '<w:tc>' + _cell_props(width, header_fill)
+        + paragraph_xml(run_xml(str(title), bold=True, color=header_color)) + '</w:tc>'
+        for width, title in zip(widths, header)
+    )
+    return (
+        f'<w:tbl{ns}><w:tblPr>{style}<w:tblW w:w="{sum(widths)}" w:type="dxa"/>'
+        '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" '
+        'w:noHBand="0" w:noVBand="1"/></w:tblPr><w:tblGrid>'
+        + ''.join(f'<w:gridCol w:w="{width}"/>' for width in widths)
+        + f'</w:tblGrid><w:tr><w:trPr><w:tblHeader/></w:trPr>{head_cells}</w:tr>'
+    )
+
+
+def table_rows_xml(rows, widths):
+    """w:tr elements for rows of cell values; cell properties are built once per column"""
+    cell_open = ['<w:tc>' + _cell_props(width) for width in widths]
+    parts = []
+    for row in rows:
+        if len(row) != len(widths):
+            raise ValueError(f"Table row has {len(row)} cells, expected {len(widths)}: {row!r}")
+        parts.append('<w:tr>')
+        for opening, value in zip(cell_open, row):
+            text = '' if value is None else str(value)
+            parts.append(opening + paragraph_xml(run_xml(text) if text else '') + '</w:tc>')
+        parts.append('</w:tr>')
+    return ''.join(parts)
+
+
+def table_xml(header, rows, total_width, weights=None, style_id=None, header_fill=None,
+              header_color=None, namespace=False):
+    """A complete w:tbl built in one pass; total_width is in twips"""
+    widths = column_widths(total_width, weights, len(header))
+    return (
+        table_start_xml(header, widths, style_id, header_fill, header_color, namespace)
+        + table_rows_xml(rows, widths) + '</w:tbl>'
+    )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Fingerprinted cache of rendered slide and section XML for incremental rebuilds
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from theflow_assets import CACHE_DIR, file_sha256
+
+# Rendered parts kept on disk (override the location with THEFLOW_CACHE_DIR)
+PART_CACHE_DIR = os.path.join(CACHE_DIR, 'parts')
+PART_CACHE_MAX_ENTRIES = int(os.environ.get('THEFLOW_PART_CACHE_MAX_ENTRIES', 20000))
+
+# Modules whose source feeds the cached bytes of each artifact type; hashed with renderer_digest()
+# so a change to any of them invalidates what they rendered
+DECK_SOURCES = ('theflow_deck.py', 'theflow_master.py', 'theflow_styles.py', 'theflow_templates.py')
+MANUAL_SOURCES = ('theflow_manual.py', 'theflow_ooxml.py', 'theflow_templates.py')
+WORKBOOK_SOURCES = ('theflow_workbooks.py', 'theflow_content.py', 'theflow_docx_stream.py',
+                    'theflow_ooxml.py', 'theflow_manual.py', 'theflow_templates.py', 'theflow_zip.py')
+
+# (path, size, mtime) -> sha256, so each image is hashed once per process
+_IMAGE_HASHES = {}
+
+
+def image_digest(path):
+    """Return the SHA-256 of an image file, memoized on its size and mtime"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _IMAGE_HASHES:
+        _IMAGE_HASHES[key] = file_sha256(path)
+    return _IMAGE_HASHES[key]
+
+
+def renderer_digest(*paths):
+    """Hash renderer source files so a code change invalidates everything they rendered"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def fingerprint(renderer, inputs, image_files=None, image_keys=()):
+    """Fingerprint one slide or section from its inputs and the images it places"""
+    digest = hashlib.sha256(renderer.encode('ascii'))
+    digest.update(json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=list).encode('utf-8'))
+    for key in sorted(set(image_keys)):
+        path = image_files[key]
+        # python-pptx records the file name as the picture description, so it is an input too
+        digest.update(f"\0{key}\0{os.path.basename(path)}\0{image_digest(path)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PartCache:
+    """Rendered XML keyed by fingerprint, one JSON file per part"""
+
+    def __init__(self, root=None, enabled=True, max_entries=PART_CACHE_MAX_ENTRIES):
+        self.root = root or PART_CACHE_DIR
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, fp):
+        return os.path.join(self.root, fp[:2], fp + '.json')
+
+    def get(self, fp):
+        """Return the cached entry for a fingerprint, or None"""
+        if not self.enabled:
+            return None
+        path = self._path(fp)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return entry
+
+    def put(self, fp, entry):
+        """Store a rendered entry atomically"""
+        if not self.enabled:
+            return
+        path = self._path(fp)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """Drop the least recently used parts beyond max_entries"""
+        if not self.enabled or not os.path.isdir(self.root):
+            return
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    pass
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def summary(self, what):
+        """One-line reuse report, e.g. 'Reused 13/14 slides from the part cache'"""
+        return f"Reused {self.hits}/{self.hits + self.misses} {what} from the part cache"
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Native PDF renderer for manual_spec sections: the technical manual and the lesson content appendix
+
+Pages are laid out in pure Python with the standard PDF fonts (Helvetica and Courier, which every
+viewer provides), so no office suite is involved. Every section starts on a new page, as in the
+Word manual, so sections are laid out independently as chapters in worker processes;
+stitch_pdf() then numbers the pages, embeds each image once and writes the file.
+"""
+
+import io
+import re
+import unicodedata
+import zlib
+
+from manual_spec import MANUAL_SECTIONS
+from theflow_build import run_jobs
+from theflow_manual import BLUE_PRIMARY, DOCUMENT_STYLES, toc_items
+from theflow_startup import timed_import
+from theflow_trace import span
+from theflow_zip import build_time, zip_level
+
+MANUAL_PDF_FILENAME = 'TheFlow_Manual_Tecnico_Completo.pdf'
+APPENDIX_PDF_FILENAME = 'TheFlow_Apendice_Conteudo.pdf'
+
+# US Letter with one-inch margins, like the Word manual; units are points
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 72
+BODY_WIDTH = PAGE_WIDTH - 2 * MARGIN
+LINE_SPACING = 1.2
+PARAGRAPH_SPACE = 6
+BULLET_INDENT = 18
+CELL_PADDING = 4
+TABLE_FONT_SIZE = 10
+FOOTER_FONT_SIZE = 9
+GRAY = (128, 128, 128)
+
+FONTS = {'regular': ('F1', 'Helvetica'), 'bold': ('F2', 'Helvetica-Bold'), 'code': ('F3', 'Courier')}
+
+# Helvetica and Helvetica-Bold advance widths (1/1000 em) of ASCII 32-126, from the Adobe AFM files
+_ASCII_WIDTHS = {
+    'regular': [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ],
+    'bold': [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ],
+}
+# Non-ASCII WinAnsi characters that are not an accented ASCII letter
+_EXTRA_WIDTHS = {
+    '–': 556, '—': 1000, '‘': 222, '’': 222, '“': 333, '”': 333, '•': 350, '…': 1000,
+    '€': 556, '«': 556, '»': 556, 'º': 365, 'ª': 370, '°': 400, '©': 737, '®': 737, '×': 584,
+    '·': 278, 'ß': 611,
+}
+COURIER_WIDTH = 600
+
+# The standard fonts only cover WinAnsi; common characters outside it get an ASCII stand-in and
+# the rest (emoji, mostly) are dropped
+_FALLBACKS = str.maketrans({
+    '├': '|', '└': '`', '│': '|', '─': '-', '→': '->', '←': '<-', '✓': 'v', '✗': 'x',
+    '≥': '>=', '≤': '<=', '\u00a0': ' ',
+})
+
+_widths = {}
+
+
+def clean_text(text):
+    """Reduce text to the characters the standard fonts can show"""
+    return text.translate(_FALLBACKS).encode('cp1252', 'ignore').decode('cp1252')
+
+
+def _char_width(char, font):
+    if font == 'code':
+        return COURIER_WIDTH
+    if ' ' <= char <= '~':
+        return _ASCII_WIDTHS[font][ord(char) - 32]
+    base = unicodedata.normalize('NFD', char)[0]
+    if ' ' <= base <= '~':
+        return _ASCII_WIDTHS[font][ord(base) - 32]
+    return _EXTRA_WIDTHS.get(char, 556)
+
+
+def text_width(text, font, size):
+    """Width in points of clean text set in one of FONTS at size"""
+    widths = _widths.setdefault(font, {})
+    total = 0
+    for char in text:
+        if char not in widths:
+            widths[char] = _char_width(char, font)
+        total += widths[char]
+    return total * size / 1000
+
+
+def _split_long(word, font, size, width):
+    """Break a word wider than width into pieces that fit"""
+    pieces, piece = [], ''
+    for char in word:
+        if piece and text_width(piece + char, font, size) > width:
+            pieces.append(piece)
+            piece = ''
+        piece += char
+    return pieces + [piece]
+
+
+def wrap_runs(runs, width):
+    """Break [(font, size, color, text)] runs into lines no wider than width points
+
+    Returns a list of lines, each a list of runs; newlines break lines, as they do in Word, and
+    empty text gives one empty line.
+    """
+    lines, line, line_width = [], [], 0
+    for font, size, color, text in runs:
+        for i, part in enumerate(text.split('\n')):
+            if i:
+                lines.append(line)
+                line, line_width = [], 0
+            for word in re.findall(r'\S+\s*|\s+', part):
+                if line and line_width + text_width(word.rstrip(), font, size) > width:
+                    lines.append(line)
+                    line, line_width = [], 0
+                    word = word.lstrip() or word
+                pieces = [word]
+                if text_width(word, font, size) > width:
+                    pieces = _split_long(word, font, size, width)
+                for piece in pieces[:-1]:
+                    lines.append(line + [(font, size, color, piece)])
+                    line, line_width = [], 0
+                line.append((font, size, color, pieces[-1]))
+                line_width += text_width(pieces[-1], font, size)
+    lines.append(line)
+    return [_merge_runs(line) for line in lines]
+
+
+def _merge_runs(line):
+    merged = []
+    for run in line:
+        if merged and merged[-1][:3] == run[:3]:
+            merged[-1] = (*run[:3], merged[-1][3] + run[3])
+        else:
+            merged.append(run)
+    return merged
+
+
+def line_width(line):
+    """Width of a wrapped line, not counting trailing spaces"""
+    if not line:
+        return 0
+    *head, (font, size, _, text) = line
+    return sum(text_width(run[3], run[0], run[1]) for run in head) + text_width(text.rstrip(), font, size)
+
+
+def _literal(text):
+    data = text.encode('cp1252')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _rgb(color, operator):
+    return ' '.join(f'{c / 255:.3f}' for c in color or (0, 0, 0)) + f' {operator}'
+
+
+def _style(name):
+    """(font, size, color) of a DOCUMENT_STYLES paragraph style"""
+    preset = DOCUMENT_STYLES[name]
+    font = 'code' if preset['font'].startswith('Courier') else 'bold' if preset.get('bold') else 'regular'
+    return font, preset['size'], preset.get('color')
+
+
+HEADING_STYLES = {0: ('bold', 28, BLUE_PRIMARY), 1: _style('Heading 1'), 2: _style('Heading 2'),
+                  3: ('bold', 13, BLUE_PRIMARY)}
+
+
+def image_name(key):
+    """PDF resource name of an IMAGE_URLS key"""
+    return 'Im_' + re.sub(r'\W', '_', key)
+
+
+class Chapter:
+    """Pages of one section, laid out top to bottom; use through layout_chapter()"""
+
+    def __init__(self, label, image_files):
+        self.label = label
+        self.image_files = image_files
+        self.pages = []
+        self.images = {}
+        self.outline = []
+        self.new_page()
+
+    def new_page(self):
+        self.pages.append(bytearray())
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def at_top(self):
+        return self.y == PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height):
+        """Start a new page unless height points still fit on this one"""
+        if self.y - height < MARGIN and not self.at_top():
+            self.new_page()
+
+    def space(self, points):
+        if not self.at_top():
+            self.y -= points
+
+    def draw(self, ops):
+        self.pages[-1] += ops.encode('ascii') if isinstance(ops, str) else ops
+        self.pages[-1] += b'\n'
+
+    def _draw_line(self, x, baseline, line):
+        ops = [f'BT {x:.2f} {baseline:.2f} Td'.encode('ascii')]
+        for font, size, color, text in line:
+            ops.append(f'/{FONTS[font][0]} {size} Tf {_rgb(color, "rg")} '.encode('ascii')
+                       + _literal(text) + b' Tj')
+        ops.append(b'ET')
+        self.draw(b' '.join(ops))
+
+    def text(self, runs, indent=0, align='left', marker=None, space_after=PARAGRAPH_SPACE):
+        """Lay out a paragraph of runs; marker is a bullet drawn in the indent of its first line"""
+        width = BODY_WIDTH - indent
+        size = max((run[1] for run in runs), default=DOCUMENT_STYLES['Normal']['size'])
+        leading = size * LINE_SPACING
+        for i, line in enumerate(wrap_runs(runs, width)):
+            self.ensure(leading)
+            baseline = self.y - size
+            x = MARGIN + indent
+            if align == 'center':
+                x = MARGIN + (BODY_WIDTH - line_width(line)) / 2
+            if line:
+                self._draw_line(x, baseline, line)
+            if marker and i == 0:
+                self._draw_line(x - BULLET_INDENT / 2, baseline, [marker])
+            self.y -= leading
+        self.space(space_after)
+
+    def heading(self, text, level):
+        font, size, color = HEADING_STYLES.get(level, HEADING_STYLES[3])
+        self.space(size * 0.6)
+        # Keep a heading with at least two lines of what follows
+        self.ensure(size * LINE_SPACING + 2 * DOCUMENT_STYLES['Normal']['size'] * LINE_SPACING)
+        if level == 1:
+            self.outline.append((text, len(self.pages) - 1, round(self.y)))
+        self.text([(font, size, color, text)], space_after=4)
+
+    def code(self, text):
+        font, size, color = _style('Code')
+        leading = size * LINE_SPACING
+        for source_line in text.rstrip('\n').split('\n'):
+            for line in wrap_runs([(font, size, color, source_line.rstrip())], BODY_WIDTH):
+                self.ensure(leading)
+                if line:
+                    self._draw_line(MARGIN, self.y - size, line)
+                self.y -= leading
+        self.space(PARAGRAPH_SPACE)
+
+    def image(self, key, width_inches):
+        timed_import('PIL.Image')
+        from PIL import Image
+
+        with Image.open(self.image_files[key]) as image:
+            pixels_wide, pixels_high = image.size
+        width = min(width_inches * 72, BODY_WIDTH)
+        height = width * pixels_high / pixels_wide
+        if height > PAGE_HEIGHT - 2 * MARGIN:
+            height = PAGE_HEIGHT - 2 * MARGIN
+            width = height * pixels_wide / pixels_high
+        self.ensure(height)
+        name = self.images.setdefault(key, image_name(key))
+        x = MARGIN + (BODY_WIDTH - width) / 2
+        self.draw(f'q {width:.2f} 0 0 {height:.2f} {x:.2f} {self.y - height:.2f} cm /{name} Do Q')
+        self.y -= height
+        self.space(PARAGRAPH_SPACE)
+
+    def _table_row(self, cells, widths, font, color, fill):
+        wrapped = [wrap_runs([(font, TABLE_FONT_SIZE, color, clean_text(str(cell)))], w - 2 * CELL_PADDING)
+                   for cell, w in zip(cells, widths)]
+        leading = TABLE_FONT_SIZE * LINE_SPACING
+        height = max(len(lines) for lines in wrapped) * leading + 2 * CELL_PADDING
+        return wrapped, height, fill
+
+    def _draw_row(self, row, widths):
+        wrapped, height, fill = row
+        x = MARGIN
+        top = self.y
+        leading = TABLE_FONT_SIZE * LINE_SPACING
+        for lines, width in zip(wrapped, widths):
+            if fill:
+                self.draw(f'{_rgb(fill, "rg")} {x:.2f} {top - height:.2f} {width:.2f} {height:.2f} re f')
+            self.draw(f'0.5 w {_rgb(GRAY, "RG")} {x:.2f} {top - height:.2f} {width:.2f} {height:.2f} re S')
+            baseline = top - CELL_PADDING - TABLE_FONT_SIZE
+            for line in lines:
+                if line:
+                    self._draw_line(x + CELL_PADDING, baseline, line)
+                baseline -= leading
+            x += width
+        self.y -= height
+
+    def table(self, header, rows, weights=None):
+        weights = weights or [1] * len(header)
+        widths = [BODY_WIDTH * w / sum(weights) for w in weights]
+        head = self._table_row(header, widths, 'bold', (255, 255, 255), BLUE_PRIMARY)
+        self.ensure(head[1] * 2)
+        self._draw_row(head, widths)
+        for cells in rows:
+            row = self._table_row(cells, widths, 'regular', None, None)
+            if self.y - row[1] < MARGIN:
+                # Continue on a new page under a repeated header
+                self.new_page()
+                self._draw_row(head, widths)
+            self._draw_row(row, widths)
+        self.space(PARAGRAPH_SPACE * 2)
+
+    def block(self, block, toc):
+        """Lay out one spec block"""
+        normal = _style('Normal')
+        kind = block[0]
+        if kind == 'title':
+            self.heading(clean_text(block[1]), 0)
+        elif kind == 'centered':
+            text, size, bold = (block[1:] + (None, False))[:3]
+            self.text([('bold' if bold else 'regular', size or normal[1], None, clean_text(text))],
+                      align='center')
+        elif kind == 'heading':
+            self.heading(clean_text(block[1]), block[2])
+        elif kind == 'paragraph':
+            style = _style(block[2]) if len(block) > 2 and block[2] in DOCUMENT_STYLES else normal
+            self.text([(*style, clean_text(block[1]))])
+        elif kind == 'bold_paragraph':
+            self.text([('bold', normal[1], None, clean_text(block[1]))])
+        elif kind == 'bullets':
+            for item in block[1]:
+                self._bullet(item, 'regular', 1)
+        elif kind == 'bullet_group':
+            self._bullet(block[1], 'bold', 1)
+            for item in block[2]:
+                self._bullet(item, 'regular', 2)
+        elif kind == 'definitions':
+            for term, definition in block[1]:
+                self.text([('bold', normal[1], None, clean_text(f'{term}: ')),
+                           ('regular', normal[1], None, clean_text(definition))])
+        elif kind == 'code':
+            self.code(clean_text(block[1]))
+        elif kind == 'table':
+            self.table(*block[1:])
+        elif kind == 'image':
+            self.image(block[1], block[2])
+        elif kind == 'toc':
+            for item in toc:
+                self.text([('regular', normal[1], None, clean_text(item))], indent=BULLET_INDENT,
+                          space_after=2)
+        else:
+            raise ValueError(f"Unknown manual block kind: {kind!r}")
+
+    def _bullet(self, text, font, level):
+        # Spec items often carry their own '• '; hang it in the indent instead of the default
+        text = clean_text(text).strip()
+        symbol = '•' if level == 1 else '–'
+        if text[:1] in ('•', '–', '-') and text[1:2] == ' ':
+            symbol, text = text[0], text[2:]
+        size = _style('Normal')[1]
+        self.text([(font, size, None, text)], indent=BULLET_INDENT * level,
+                  marker=('regular', size, None, symbol), space_after=2)
+
+
+def layout_chapter(section, image_files, toc):
+    """Lay out one section on its own pages; returns a picklable chapter for stitch_pdf()"""
+    with span('section', section['label'], echo=True):
+        chapter = Chapter(section['label'], image_files)
+        for block in section['blocks']:
+            chapter.block(block, toc)
+    return {'label': chapter.label, 'pages': [bytes(page) for page in chapter.pages],
+            'images': chapter.images, 'outline': chapter.outline}
+
+
+def _image_object(path):
+    """(dictionary entries, encoded data) of an image XObject; JPEG files are embedded as is"""
+    timed_import('PIL.Image')
+    from PIL import Image
+
+    with Image.open(path) as image:
+        if image.format == 'JPEG' and image.mode in ('RGB', 'L'):
+            space = 'DeviceRGB' if image.mode == 'RGB' else 'DeviceGray'
+            with open(path, 'rb') as f:
+                data = f.read()
+            return (f'/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} '
+                    f'/ColorSpace /{space} /BitsPerComponent 8 /Filter /DCTDecode'), data
+        if image.mode in ('RGBA', 'LA', 'P'):
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = image.convert('RGB')
+        return (f'/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} '
+                f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode'), \
+            zlib.compress(image.tobytes(), 6)
+
+
+def _text_string(text):
+    """PDF text string (UTF-16BE) for outline titles and document info"""
+    return '<FEFF' + text.encode('utf-16-be').hex().upper() + '>'
+
+
+def stitch_pdf(chapters, image_files, title):
+    """Join laid-out chapters into one PDF with page numbers, shared images and an outline"""
+    level = zip_level()
+    objects = [None, None]  # catalog and page tree, filled in last
+
+    def add(entries, data=None, encoded=False):
+        # Returns the new object's number; streams are deflated unless already encoded
+        if data is None:
+            objects.append(f'<< {entries} >>'.encode('ascii'))
+            return len(objects)
+        if not encoded and level:
+            entries, data = f'{entries} /Filter /FlateDecode'.strip(), zlib.compress(data, level)
+        objects.append(f'<< {entries} /Length {len(data)} >>\nstream\n'.encode('ascii')
+                       + data + b'\nendstream')
+        return len(objects)
+
+    fonts = ' '.join(f'/{name} {add(f"/Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding")} 0 R'
+                     for name, base in FONTS.values())
+    images = {}
+    for chapter in chapters:
+        for key, name in chapter['images'].items():
+            if name not in images:
+                images[name] = add(*_image_object(image_files[key]), encoded=True)
+    xobjects = ' '.join(f'/{name} {number} 0 R' for name, number in sorted(images.items()))
+    resources = add(f'/Font << {fonts} >> /XObject << {xobjects} >>')
+
+    page_numbers, outline = [], []
+    total = sum(len(chapter['pages']) for chapter in chapters)
+    for chapter in chapters:
+        first = len(page_numbers)
+        for page in chapter['pages']:
+            number = f'{len(page_numbers) + 1} / {total}'
+            x = (PAGE_WIDTH - text_width(number, 'regular', FOOTER_FONT_SIZE)) / 2
+            footer = (f'BT /{FONTS["regular"][0]} {FOOTER_FONT_SIZE} Tf {_rgb(GRAY, "rg")} '
+                      f'{x:.2f} {MARGIN / 2:.2f} Td ({number}) Tj ET')
+            contents = add('', page)
+            footer_ref = add('', footer.encode('ascii'))
+            page_numbers.append(add(f'/Type /Page /Parent 2 0 R /Resources {resources} 0 R '
+                                    f'/Contents [{contents} 0 R {footer_ref} 0 R]'))
+        outline += [(text, page_numbers[first + page], y) for text, page, y in chapter['outline']]
+
+    catalog = '/Type /Catalog /Pages 2 0 R'
+    if outline:
+        root = len(objects) + 1
+        items = list(range(root + 1, root + 1 + len(outline)))
+        add(f'/Type /Outlines /First {items[0]} 0 R /Last {items[-1]} 0 R /Count {len(items)}')
+        for i, (text, page, y) in enumerate(outline):
+            links = (f' /Prev {items[i - 1]} 0 R' if i else '') + \
+                (f' /Next {items[i + 1]} 0 R' if i + 1 < len(items) else '')
+            add(f'/Title {_text_string(text)} /Parent {root} 0 R{links} /Dest [{page} 0 R /XYZ 0 {y} 0]')
+        catalog += f' /Outlines {root} 0 R /PageMode /UseOutlines'
+    objects[0] = f'<< {catalog} >>'.encode('ascii')
+    kids = ' '.join(f'{number} 0 R' for number in page_numbers)
+    objects[1] = (f'<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} '
+                  f'/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] >>').encode('ascii')
+    created = build_time().strftime("D:%Y%m%d%H%M%SZ")
+    info = add(f'/Title {_text_string(title)} /Producer (The Flow document generators) '
+               f'/CreationDate ({created}) /ModDate ({created})')
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n'.encode('ascii') + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii'))
+    out.write(''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('ascii'))
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {info} 0 R >>\n'
+              f'startxref\n{xref}\n%%EOF\n'.encode('ascii'))
+    return out.getvalue()
+
+
+def render_pdf(sections, image_files, title, max_workers=None):
+    """Lay out sections as chapters in parallel and return the stitched PDF bytes"""
+    sections = [{'label': section['label'], 'blocks': list(section['blocks'])} for section in sections]
+    toc = toc_items(sections)
+    jobs = [(section['label'], layout_chapter, (section, image_files, toc)) for section in sections]
+    chapters = [chapter for _, chapter, _ in run_jobs(jobs, max_workers)]
+    with span('stitch', title, pages=sum(len(chapter['pages']) for chapter in chapters)):
+        return stitch_pdf(chapters, image_files, title)
+
+
+def build_pdf(filename, title, image_files, sections=MANUAL_SECTIONS, max_workers=None):
+    """Render sections to a PDF file; image_files maps the IMAGE_URLS keys they place to files"""
+    print(f"\n=== Creating PDF: {title} ===\n")
+    data = render_pdf(sections, image_files, title, max_workers)
+    with span('save', filename):
+        with open(filename, 'wb') as f:
+            f.write(data)
+    print(f"\n✓ PDF created: {filename}\n")
+    return filename
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+In-memory rendering API: build a document and get its package bytes, without writing output files
+
+For web handlers and queue workers that stream results to clients or object storage:
+
+    from theflow_render import deck_bytes, MEDIA_TYPES
+    body = deck_bytes()                       # the commercial deck as .pptx bytes
+    headers = {'Content-Type': MEDIA_TYPES['pptx']}
+
+Images still go through the shared asset and optimized-image caches, and are prepared once per
+process; pass incremental=False to also skip the part cache.
+"""
+
+import io
+
+from deck_spec import DECK_COLORS, DECK_SLIDES
+from manual_spec import MANUAL_SECTIONS
+from theflow_assets import IMAGE_URLS, fetch_assets
+from theflow_deck import deck_image_widths, render_presentation
+from theflow_images import IMAGE_DPI, optimize_images
+from theflow_manual import manual_image_widths, render_manual
+from theflow_parts import PartCache
+from theflow_trace import span
+from theflow_zip import save_package
+
+MEDIA_TYPES = {
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Prepared image paths by (asset key, width, dpi, offline), kept for the life of the process
+_PREPARED = {}
+
+
+def prepare_images(widths, offline=None, dpi=IMAGE_DPI, refresh=False):
+    """Fetch and optimize IMAGE_URLS keys for {key: width_inches}, each once per process"""
+    missing = {key: width for key, width in widths.items()
+               if refresh or (key, width, dpi, offline) not in _PREPARED}
+    if missing:
+        image_files = fetch_assets(list(missing), offline=offline)
+        if dpi:
+            image_files = optimize_images(image_files, missing, dpi)
+        for key, path in image_files.items():
+            _PREPARED[key, missing[key], dpi, offline] = path
+    return {key: _PREPARED[key, width, dpi, offline] for key, width in widths.items()}
+
+
+def seed_images(widths, image_files, offline=None, dpi=IMAGE_DPI):
+    """Record images prepared elsewhere (e.g. by a parent process) so prepare_images reuses them"""
+    for key, width in widths.items():
+        _PREPARED[key, width, dpi, offline] = image_files[key]
+
+
+def document_bytes(document):
+    """Serialize a python-pptx Presentation or python-docx Document to bytes in memory"""
+    buffer = io.BytesIO()
+    with span('save', 'in-memory'):
+        save_package(document, buffer)
+    return buffer.getvalue()
+
+
+def _spec_images(widths, extra_images, offline, dpi):
+    extra_images = extra_images or {}
+    widths = {key: width for key, width in widths.items()
+              if key in IMAGE_URLS and key not in extra_images}
+    return {**prepare_images(widths, offline, dpi), **extra_images}
+
+
+def deck_bytes(slides=DECK_SLIDES, colors=DECK_COLORS, extra_images=None, offline=None,
+               dpi=IMAGE_DPI, incremental=True):
+    """Render deck_spec slides to .pptx bytes
+
+    extra_images maps asset keys that are not IMAGE_URLS (e.g. a brand logo) to local files.
+    """
+    image_files = _spec_images(deck_image_widths(slides), extra_images, offline, dpi)
+    prs = render_presentation(image_files, slides, colors, PartCache(enabled=incremental))
+    return document_bytes(prs)
+
+
+def manual_bytes(sections=MANUAL_SECTIONS, offline=None, dpi=IMAGE_DPI, incremental=True):
+    """Render manual_spec sections to .docx bytes"""
+    image_files = _spec_images(manual_image_widths(sections), None, offline, dpi)
+    doc = render_manual(image_files, sections, PartCache(enabled=incremental))
+    return document_bytes(doc)
+
+
+def lesson_deck_bytes(lesson, reviews=(), colors=DECK_COLORS, logo=None, incremental=True):
+    """Render one lesson's classroom deck to .pptx bytes; logo is an optional local image file"""
+    from theflow_lesson_decks import lesson_slides
+
+    images = {'brand_logo': logo} if logo else {}
+    prs = render_presentation(images, lesson_slides(lesson, reviews, 'brand_logo' if logo else None),
+                              colors, PartCache(enabled=incremental))
+    return document_bytes(prs)
+
+
+def workbook_bytes(lesson):
+    """Stream one lesson's workbook into memory and return the .docx bytes"""
+    from theflow_docx_stream import StreamingDocument
+    from theflow_workbooks import workbook_sections
+
+    buffer = io.BytesIO()
+    with StreamingDocument(buffer) as doc:
+        doc.write_sections(workbook_sections(lesson))
+    return buffer.getvalue()
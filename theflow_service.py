@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Local document-rendering service: HTTP front end, warm worker pool, bounded queue, result cache
+
+    python theflow_service.py --port 8750 --workers 2 --brands brand_profiles.json
+
+Workers import python-pptx/python-docx, parse the templates and receive the optimized media once,
+at start-up, so a request pays only for rendering. Requests beyond the workers plus --queue
+waiting slots are refused with 503 and a Retry-After header. Results are cached in memory by a
+hash of the request, and identical requests in flight share one render.
+
+    POST /render/deck          {"brand": ID, "slides": [deck_spec slides]}      both optional
+    POST /render/manual        {"sections": [manual_spec sections]}             optional
+    POST /render/lesson-deck   {"lesson": N, "brand": ID}                       brand optional
+    POST /render/workbook      {"lesson": N}
+    GET  /health               pool, queue and cache statistics
+
+Responses carry the document with its Content-Type, X-Cache (hit or miss) and X-Input-Hash.
+Invalid input is a 400 with {"error": ...}. The service binds to localhost by default.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from theflow_images import IMAGE_DPI, merge_widths
+from theflow_startup import timed_import
+
+DEFAULT_PORT = 8750
+DEFAULT_QUEUE = 8
+RESULT_CACHE_MB = 256
+RENDER_TIMEOUT = 120
+MAX_REQUEST_BYTES = 1024 * 1024
+RETRY_AFTER = 2
+# Seconds between trims of the on-disk part cache the workers render through
+PART_CACHE_PRUNE_INTERVAL = 300
+
+# Rendered artifact per request kind: (media type key, download name)
+KINDS = {
+    'deck': ('pptx', 'TheFlow_Apresentacao_Comercial{suffix}.pptx'),
+    'manual': ('docx', 'TheFlow_Manual_Tecnico_Completo.docx'),
+    'lesson-deck': ('pptx', 'TheFlow_Slides_Licao_{lesson:02d}{suffix}.pptx'),
+    'workbook': ('docx', 'TheFlow_Caderno_Licao_{lesson:02d}.docx'),
+}
+
+# Per-worker state set by _init_worker
+_WORKER = {}
+
+
+class RequestError(ValueError):
+    """A request the service refuses with 400"""
+
+
+def input_hash(kind, payload):
+    """Hash of a request's kind and canonical JSON payload, the result cache key"""
+    canonical = json.dumps([kind, payload], sort_keys=True, separators=(',', ':'),
+                           ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _as_spec_sections(sections):
+    # manual_spec blocks are tuples; JSON delivers them as lists
+    return [{**section, 'blocks': [tuple(block) for block in section['blocks']]}
+            for section in sections]
+
+
+def _init_worker(image_sets, brands, brand_images, content, offline, dpi):
+    """Pool initializer: import the renderers, parse the templates and keep the prepared media"""
+    timed_import('pptx', 'pptx.util', 'pptx.enum.text', 'pptx.dml.color', 'docx', 'docx.shared',
+                 'docx.enum.text', 'docx.enum.style')
+    from theflow_deck import render_presentation
+    from theflow_manual import render_manual
+    from theflow_render import seed_images
+
+    for widths, image_files in image_sets:
+        seed_images(widths, image_files, offline, dpi)
+    render_presentation({}, [])
+    render_manual({}, [])
+    _WORKER.update(brands=brands, brand_images=brand_images, offline=offline, dpi=dpi,
+                   lessons={lesson['lesson_number']: lesson for lesson in content['lessons']},
+                   reviews=content.get('review_sections', []))
+
+
+def render_request(kind, payload):
+    """Render one validated request in a worker and return the document bytes"""
+    from deck_spec import DECK_COLORS, DECK_SLIDES
+    from manual_spec import MANUAL_SECTIONS
+    from theflow_brands import brand_colors, brand_slides
+    from theflow_render import deck_bytes, lesson_deck_bytes, manual_bytes, workbook_bytes
+
+    brand = _WORKER['brands'].get(payload.get('brand'))
+    colors = brand_colors(brand) if brand else DECK_COLORS
+    if kind == 'deck':
+        slides = payload.get('slides', DECK_SLIDES)
+        extra = {}
+        if brand:
+            slides = brand_slides(brand, slides)
+            extra = _WORKER['brand_images'][brand['id']]
+        return deck_bytes(slides, colors, extra, _WORKER['offline'], _WORKER['dpi'])
+    if kind == 'manual':
+        sections = MANUAL_SECTIONS
+        if 'sections' in payload:
+            sections = _as_spec_sections(payload['sections'])
+        return manual_bytes(sections, _WORKER['offline'], _WORKER['dpi'])
+    lesson = _WORKER['lessons'][payload['lesson']]
+    if kind == 'lesson-deck':
+        logo = _WORKER['brand_images'][brand['id']].get('brand_logo') if brand else None
+        return lesson_deck_bytes(lesson, _WORKER['reviews'], colors, logo)
+    return workbook_bytes(lesson)
+
+
+class ResultCache:
+    """Thread-safe LRU of rendered documents, bounded by total bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses}
+
+
+class RenderService:
+    """Validate requests, then render them on the warm pool with backpressure and caching"""
+
+    def __init__(self, workers=1, queue=DEFAULT_QUEUE, brands=(), content_path=None, offline=None,
+                 dpi=IMAGE_DPI, cache_bytes=RESULT_CACHE_MB * 1024 * 1024, timeout=RENDER_TIMEOUT):
+        from theflow_brands import prepare_brand_images
+        from theflow_content import CONTENT_PATH, load_content
+        from theflow_deck import deck_image_widths
+        from theflow_manual import manual_image_widths
+        from theflow_render import prepare_images
+
+        self.workers = workers
+        self.capacity = workers + queue
+        self.timeout = timeout
+        self.cache = ResultCache(cache_bytes)
+        self.brands = {brand['id']: brand for brand in brands}
+        self.content = load_content(content_path or CONTENT_PATH)
+        self.lessons = {lesson['lesson_number'] for lesson in self.content['lessons']}
+        self.rendered = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        # Fetch and optimize the media once here; the workers only receive the file paths
+        image_sets = [(widths, prepare_images(widths, offline, dpi))
+                      for widths in (deck_image_widths(), manual_image_widths())]
+        brand_images = {brand_id: prepare_brand_images(brand, dpi)
+                        for brand_id, brand in self.brands.items()}
+        all_widths = merge_widths(*(widths for widths, _ in image_sets))
+        print(f"Prepared {len(all_widths)} images and {len(brand_images)} brands")
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(image_sets, self.brands, brand_images, self.content, offline, dpi),
+        )
+        # Start every worker now rather than on the first requests
+        for future in [self.pool.submit(time.sleep, 0) for _ in range(workers)]:
+            future.result()
+        threading.Thread(target=self._prune_parts, daemon=True).start()
+
+    def _prune_parts(self):
+        """Keep the part cache within its bounds while the service runs"""
+        from theflow_parts import PartCache
+
+        pruned_at = 0
+        while not self._closed.wait(PART_CACHE_PRUNE_INTERVAL):
+            if self.rendered != pruned_at:
+                pruned_at = self.rendered
+                PartCache().prune()
+
+    def validate(self, kind, payload):
+        """Raise RequestError unless payload is a well-formed request of kind"""
+        if kind not in KINDS:
+            raise RequestError(f"unknown document kind {kind!r}; use one of {', '.join(KINDS)}")
+        if not isinstance(payload, dict):
+            raise RequestError("request body must be a JSON object")
+        allowed = {'deck': {'brand', 'slides'}, 'manual': {'sections'},
+                   'lesson-deck': {'lesson', 'brand'}, 'workbook': {'lesson'}}[kind]
+        unknown = sorted(set(payload) - allowed)
+        if unknown:
+            raise RequestError(f"unknown fields for {kind}: {', '.join(unknown)}")
+        if 'brand' in payload and payload['brand'] not in self.brands:
+            raise RequestError(f"unknown brand id {payload['brand']!r}")
+        # type() rather than isinstance(): True and 1.0 compare equal to lesson 1
+        lesson = payload.get('lesson')
+        if kind in ('lesson-deck', 'workbook') and (
+                type(lesson) is not int or lesson not in self.lessons):
+            raise RequestError(f"'lesson' must be one of the lesson numbers 1-{max(self.lessons)}")
+        for field, required in (('slides', ('label', 'kind')), ('sections', ('label', 'blocks'))):
+            items = payload.get(field, [])
+            if not isinstance(items, list) or not all(
+                    isinstance(item, dict) and all(key in item for key in required)
+                    for item in items):
+                raise RequestError(f"'{field}' must be a list of objects with "
+                                   f"{' and '.join(repr(key) for key in required)}")
+
+    def render(self, kind, payload):
+        """Return (body, cache_hit, key); None body means the queue is full"""
+        key = input_hash(kind, payload)
+        body = self.cache.get(key)
+        if body is not None:
+            return body, True, key
+
+        submitted = False
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                if not self._slots.acquire(blocking=False):
+                    self.rejected += 1
+                    return None, False, key
+                future = self.pool.submit(render_request, kind, payload)
+                self._in_flight[key] = future
+                submitted = True
+        if submitted:
+            # Outside the lock: a future that is already done runs the callback right here
+            future.add_done_callback(lambda _, key=key: self._finished(key))
+        body = future.result(timeout=self.timeout)
+        self.cache.put(key, body)
+        return body, False, key
+
+    def _finished(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self.rendered += 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._in_flight)
+        return {'workers': self.workers, 'capacity': self.capacity, 'in_flight': in_flight,
+                'rendered': self.rendered, 'rejected': self.rejected, 'cache': self.cache.stats()}
+
+    def close(self):
+        self._closed.set()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type='application/json', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data, headers=()):
+        self._send(status, json.dumps(data).encode('utf-8') + b'\n', headers=headers)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        from theflow_render import MEDIA_TYPES
+
+        service = self.server.service
+        if not self.path.startswith('/render/'):
+            self._send_json(404, {'error': 'not found'})
+            return
+        kind = self.path[len('/render/'):]
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(413, {'error': f"request body over {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            service.validate(kind, payload)
+            body, hit, key = service.render(kind, payload)
+            media, filename = KINDS[kind]
+            brand = payload.get('brand')
+            filename = filename.format(suffix=f"_{brand}" if brand else '',
+                                       lesson=payload.get('lesson', 0))
+        except (ValueError, KeyError, TypeError) as exc:
+            # Includes JSON errors and specs the renderers reject, raised back from the worker
+            self._send_json(400, {'error': str(exc)})
+            return
+        except FutureTimeout:
+            self._send_json(504, {'error': f"render took over {service.timeout}s"})
+            return
+        except Exception as exc:
+            self._send_json(500, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+        if body is None:
+            self._send_json(503, {'error': 'render queue is full, retry later'},
+                            headers=[('Retry-After', str(RETRY_AFTER))])
+            return
+        self._send(200, body, MEDIA_TYPES[media], headers=[
+            ('Content-Disposition', f'attachment; filename="{filename}"'),
+            ('X-Cache', 'hit' if hit else 'miss'),
+            ('X-Input-Hash', key),
+        ])
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """Create the HTTP server for a RenderService; call serve_forever() on it"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind (default: localhost)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=1, help='warm worker processes')
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE,
+                        help=f'requests allowed to wait for a worker before 503 '
+                             f'(default: {DEFAULT_QUEUE})')
+    parser.add_argument('--cache-mb', type=int, default=RESULT_CACHE_MB,
+                        help=f'result cache size in MB (default: {RESULT_CACHE_MB})')
+    parser.add_argument('--brands', help='brand profiles file (see theflow_brands.py)')
+    parser.add_argument('--content', help='lesson corpus JSON file')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='resolve images from the local asset bundle only')
+    parser.add_argument('--image-dpi', type=int, default=IMAGE_DPI,
+                        help=f'resample images to this many pixels per placed inch, 0 keeps the '
+                             f'originals (default: {IMAGE_DPI})')
+    args = parser.parse_args(argv)
+
+    brands = []
+    if args.brands:
+        from theflow_brands import load_brands
+        try:
+            brands = load_brands(args.brands)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+
+    service = RenderService(args.workers, args.queue, brands, args.content, args.offline,
+                            args.image_dpi, args.cache_mb * 1024 * 1024)
+    server = serve(service, args.host, args.port)
+    print(f"Rendering service on http://{args.host}:{server.server_address[1]} "
+          f"({args.workers} workers, {args.queue} queued requests)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
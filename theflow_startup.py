@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Lazy import helpers and a startup-time report for The Flow document generators
+"""
+
+import importlib
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+
+# Seconds spent importing each heavy module, in import order
+IMPORT_TIMINGS = {}
+
+# The same for worker processes (see theflow_build.run_jobs), slowest worker per module
+WORKER_IMPORT_TIMINGS = {}
+
+# (label, seconds since PROCESS_START) checkpoints such as "assets ready"
+STARTUP_MARKS = []
+
+
+def timed_import(*names):
+    """Import modules on first use, recording how long each one took"""
+    for name in names:
+        if name in sys.modules:
+            continue
+        start = time.perf_counter()
+        importlib.import_module(name)
+        IMPORT_TIMINGS[name] = time.perf_counter() - start
+
+
+def merge_worker_imports(timings):
+    """Record the IMPORT_TIMINGS a worker process sent back"""
+    for name, seconds in timings.items():
+        # Forked workers inherit this process's timings; those imports are reported already
+        if name in IMPORT_TIMINGS:
+            continue
+        WORKER_IMPORT_TIMINGS[name] = max(seconds, WORKER_IMPORT_TIMINGS.get(name, 0))
+
+
+def mark(label):
+    """Record a startup checkpoint"""
+    STARTUP_MARKS.append((label, time.perf_counter() - PROCESS_START))
+
+
+def startup_report():
+    """Format the import timings and checkpoints as a printable report"""
+    lines = ["", "=== Startup report ===", ""]
+    for name, seconds in sorted(IMPORT_TIMINGS.items(), key=lambda item: -item[1]):
+        lines.append(f"  import {name:<28} {seconds * 1000:8.1f} ms")
+    lines.append(f"  {'total import time':<35} {sum(IMPORT_TIMINGS.values()) * 1000:8.1f} ms")
+    if WORKER_IMPORT_TIMINGS:
+        lines += ["", "  in worker processes:"]
+    for name, seconds in sorted(WORKER_IMPORT_TIMINGS.items(), key=lambda item: -item[1]):
+        lines.append(f"  import {name:<28} {seconds * 1000:8.1f} ms")
+    if STARTUP_MARKS:
+        lines.append("")
+    for label, seconds in STARTUP_MARKS:
+        lines.append(f"  {label:<35} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Named text styles for the slide builders, applied as one prebuilt paragraph-properties element
+
+Setting p.font.size, p.font.bold and p.font.color.rgb one at a time goes through a python-pptx
+proxy and an XML mutation per property. A style here is resolved once per distinct combination of
+settings and colors into an a:pPr element (alignment, space before and the default run properties)
+that each paragraph receives as a copy. The same styles become the first list level of the slide
+master's placeholders (see theflow_master.py), where paragraphs inherit them without any copy.
+
+Text goes in the same way: each paragraph is a copy of a prebuilt a:p template for its style with
+the line set on its run, and a text frame receives all of them in one operation, instead of a
+python-pptx paragraph, run and font proxy per line (benchmarks/bulk_slides.py compares the two).
+"""
+
+import copy
+import re
+from functools import lru_cache
+
+from deck_spec import DECK_COLORS
+
+# Presets by name; 'color' is a DECK_COLORS role and sizes are in points
+TEXT_STYLES = {
+    'slide_title': {'size': 36, 'bold': True, 'color': 'primary'},
+    'cover_title': {'size': 54, 'bold': True, 'color': 'on_primary', 'align': 'ctr'},
+    'cover_subtitle': {'size': 24, 'color': 'on_primary', 'align': 'ctr'},
+    'tagline': {'size': 20, 'color': 'on_primary', 'align': 'ctr'},
+    'closing_title': {'size': 36, 'bold': True, 'color': 'on_primary', 'align': 'ctr'},
+    'bullet': {'size': 18, 'space_before': 6},
+    'list_line': {'space_before': 4},
+    'list_highlight': {'bold': True, 'space_before': 4},
+}
+
+A_NAMESPACE = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+# Characters python-pptx turns into line breaks (\n, \v) or _xHHHH_ escapes; tabs are kept as is
+_SPECIAL_CHARACTERS = re.compile(r'[\x00-\x08\x0A-\x1F]')
+
+
+@lru_cache(maxsize=None)
+def _paragraph_properties(size, bold, rgb, align, space_before):
+    from pptx.oxml import parse_xml
+
+    attrs = f' algn="{align}"' if align else ''
+    children = f'<a:spcBef><a:spcPts val="{space_before * 100}"/></a:spcBef>' if space_before else ''
+    run_attrs = (f' sz="{size * 100}"' if size else '') + (' b="1"' if bold else '')
+    fill = '<a:solidFill><a:srgbClr val="%02X%02X%02X"/></a:solidFill>' % rgb if rgb else ''
+    if run_attrs or fill:
+        children += f'<a:defRPr{run_attrs}>{fill}</a:defRPr>' if fill else f'<a:defRPr{run_attrs}/>'
+    return parse_xml(f'<a:pPr xmlns:a="{A_NAMESPACE}"{attrs}>{children}</a:pPr>')
+
+
+def text_style(name, colors=DECK_COLORS, **overrides):
+    """Return the prebuilt a:pPr element of a named style; overrides replace preset settings"""
+    preset = {**TEXT_STYLES[name], **overrides}
+    role = preset.get('color')
+    return _paragraph_properties(
+        preset.get('size'), preset.get('bold', False), colors[role] if role else None,
+        preset.get('align'), preset.get('space_before'),
+    )
+
+
+@lru_cache(maxsize=None)
+def _list_style(properties, wrap):
+    from lxml import etree
+    from pptx.oxml import parse_xml
+    from pptx.oxml.ns import qn
+
+    # Reset what the master's body and title styles would add: indents, bullets, spacing
+    level = copy.deepcopy(properties)
+    level.tag = qn('a:lvl1pPr')
+    level.set('marL', '0')
+    level.set('indent', '0')
+    if level.get('algn') is None:
+        level.set('algn', 'l')
+    if level.find(qn('a:spcBef')) is None:
+        level.insert(0, parse_xml(f'<a:spcBef xmlns:a="{A_NAMESPACE}"><a:spcPts val="0"/></a:spcBef>'))
+    level.insert(1, parse_xml(f'<a:buNone xmlns:a="{A_NAMESPACE}"/>'))
+    body = (f'<a:bodyPr xmlns:a="{A_NAMESPACE}" wrap="{"square" if wrap else "none"}" lIns="91440" '
+            f'tIns="45720" rIns="91440" bIns="45720" anchor="t"><a:noAutofit/></a:bodyPr>')
+    return body, f'<a:lstStyle xmlns:a="{A_NAMESPACE}">{etree.tostring(level, encoding="unicode")}</a:lstStyle>'
+
+
+def placeholder_style(name, colors=DECK_COLORS, wrap=False, **overrides):
+    """Return (a:bodyPr, a:lstStyle) XML giving a layout placeholder a named style, top-anchored
+
+    Like a text box, the placeholder only wraps its lines when wrap is set.
+    """
+    return _list_style(text_style(name, colors, **overrides), wrap)
+
+
+def apply_style(paragraph, properties):
+    """Give a python-pptx paragraph a copy of a prebuilt a:pPr, replacing its own"""
+    p = paragraph._p
+    if p.pPr is not None:
+        p.remove(p.pPr)
+    p.insert(0, copy.deepcopy(properties))
+
+
+@lru_cache(maxsize=None)
+def _paragraph_template(properties):
+    from pptx.oxml import parse_xml
+
+    p = parse_xml(f'<a:p xmlns:a="{A_NAMESPACE}"><a:r><a:t/></a:r></a:p>')
+    if properties is not None:
+        p.insert(0, copy.deepcopy(properties))
+    return p
+
+
+def _paragraph(line, properties):
+    p = copy.deepcopy(_paragraph_template(properties))
+    run = p[-1]
+    if line and not _SPECIAL_CHARACTERS.search(line):
+        run[0].text = line
+    else:
+        # Empty lines have no run; breaks and control characters are left to python-pptx
+        p.remove(run)
+        p.append_text(line)
+    return p
+
+
+def _set_paragraphs(text_frame, paragraphs):
+    tx_body = text_frame._txBody
+    tx_body.clear_content()
+    tx_body.extend(paragraphs)
+
+
+def set_text(text_frame, text, properties=None):
+    """Set a text frame's text, one paragraph per line, and style its first paragraph
+
+    With properties None the paragraphs keep the style they inherit (from a placeholder).
+    """
+    lines = text.split('\n')
+    _set_paragraphs(text_frame, [
+        _paragraph(line, properties if i == 0 else None) for i, line in enumerate(lines)
+    ])
+
+
+def add_lines(text_frame, lines, styles=None):
+    """Fill an empty text frame with one paragraph per line
+
+    styles maps each line to its a:pPr, or to None to keep the style the paragraph inherits (from
+    a placeholder); without styles every line keeps it.
+    """
+    if lines:
+        _set_paragraphs(text_frame, [
+            _paragraph(line, styles(line) if styles else None) for line in lines
+        ])
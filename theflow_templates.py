@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Prepared base documents, built once per process and cloned for every new artifact
+
+Presentation() and Document() unzip and parse the library's default template on every call, and
+the deck and the manual then restyle the result (slide master, document styles). Here each base is
+built and styled once; new documents are deep copies of it, which skips the zip, the XML parsing
+and the style setup and renders byte-identical output.
+"""
+
+import copy
+import io
+import threading
+
+from theflow_startup import timed_import
+
+# Prepared bases by key, kept for the life of the process
+_BASES = {}
+_lock = threading.Lock()
+
+
+def _base(key, build, clone=False):
+    # Copies are made under the lock too, so no thread reads a base while another builds it
+    with _lock:
+        if key not in _BASES:
+            _BASES[key] = build()
+        return copy.deepcopy(_BASES[key]) if clone else _BASES[key]
+
+
+def _build_presentation(width, height, setup, setup_args):
+    timed_import('pptx', 'pptx.util')
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    prs.slide_width = Inches(width)
+    prs.slide_height = Inches(height)
+    if setup is not None:
+        setup(prs, *setup_args)
+    return prs
+
+
+def _build_document(setup):
+    timed_import('docx')
+    from docx import Document
+
+    doc = Document()
+    if setup is not None:
+        setup(doc)
+    return doc
+
+
+def new_presentation(width, height, setup=None, setup_args=()):
+    """Return a new, empty python-pptx Presentation with slides width x height inches
+
+    setup(prs, *setup_args) (e.g. setup_master) has already run on it; setup_args must be hashable.
+    """
+    return _base(('pptx', width, height, setup, setup_args),
+                 lambda: _build_presentation(width, height, setup, setup_args), clone=True)
+
+
+def new_document(setup=None):
+    """Return a new python-docx Document on which setup(doc) (e.g. setup_styles) has already run"""
+    return _base(('docx', setup), lambda: _build_document(setup), clone=True)
+
+
+def document_skeleton(setup=None):
+    """Return (styled Document, its saved .docx bytes); both are shared, so do not modify them"""
+    def build():
+        doc = _build_document(setup)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return doc, buffer.getvalue()
+    return _base(('skeleton', setup), build)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Nested timing spans for The Flow document generators
+
+Builders wrap each slide, section, asset fetch and save in span(). Spans nest under the span open
+in the same thread; work handed to a thread or process pool passes current_span() as the parent
+of its spans so they still nest under the stage that submitted them. With tracing on (--trace FILE
+or THEFLOW_TRACE=FILE) every finished span is appended to FILE as one JSON line, from every
+worker process, and finish_trace() converts the lines to Chrome trace format for chrome://tracing
+or ui.perfetto.dev. Spans with echo=True also print a progress line with their duration, which is
+how slides and sections report progress whether or not tracing is on. Records also carry the
+process's resident memory when the span ended; it is process-wide, not the span's own usage.
+
+    python theflow_trace.py chrome build.trace.jsonl       write build.trace.json
+    python theflow_trace.py summary build.trace.jsonl      print the slowest spans
+"""
+
+import argparse
+import itertools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+TRACE_ENV = 'THEFLOW_TRACE'
+SUMMARY_SPANS = 10
+
+# Spans that only group others; left out of the slowest-spans summary
+CONTAINER_SPANS = ('assets', 'job')
+
+_PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+_ids = itertools.count(1)
+_local = threading.local()
+_lock = threading.Lock()
+# JSON lines destination, and the file object this process opened for it
+_trace = {'path': os.environ.get(TRACE_ENV) or None, 'file': None, 'pid': None}
+
+
+def tracing():
+    """True when spans are being written to a trace file"""
+    return _trace['path'] is not None
+
+
+def rss_kb():
+    """Current resident set size of this process in KiB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_KB
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _write(record):
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    with _lock:
+        # A forked worker inherits the parent's file object; give each process its own handle
+        if _trace['file'] is None or _trace['pid'] != os.getpid():
+            _trace['file'] = open(_trace['path'], 'a', encoding='utf-8')
+            _trace['pid'] = os.getpid()
+        _trace['file'].write(line)
+        _trace['file'].flush()
+
+
+class Span:
+    """A timed region; use through span()"""
+
+    def __init__(self, name, label=None, echo=False, parent=None, **attrs):
+        self.name = name
+        self.label = label
+        self.echo = echo
+        self.attrs = attrs
+        self.seconds = None
+        self._parent = parent
+
+    def __getstate__(self):
+        # Sent to pool workers only to parent their spans
+        return {'id': self.id, 'depth': self.depth}
+
+    def set(self, **attrs):
+        """Add attributes known only once the work has run, e.g. cached=True"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault('stack', [])
+        parent = self._parent or (stack[-1] if stack else None)
+        self.id = f"{os.getpid()}-{next(_ids)}"
+        self.parent = parent.id if parent else None
+        self.depth = parent.depth + 1 if parent else 0
+        stack.append(self)
+        self.ts = time.time_ns() // 1000
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        _local.stack.pop()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        if self.echo:
+            verb = 'Reused' if self.attrs.get('cached') else 'Created'
+            print(f"{verb} {self.label} ({self.seconds * 1000:.1f} ms)")
+        if tracing():
+            _write({
+                'name': self.name,
+                'label': self.label,
+                'ts': self.ts,
+                'dur': round(self.seconds * 1e6),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'id': self.id,
+                'parent': self.parent,
+                'depth': self.depth,
+                'rss_kb': rss_kb(),
+                'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                'attrs': self.attrs,
+            })
+        return False
+
+
+def span(name, label=None, echo=False, parent=None, **attrs):
+    """Time a block as a span of kind name (e.g. 'slide', 'fetch', 'save') with an optional label
+
+    parent, a span from current_span(), nests the span under it instead of under the span open in
+    this thread; pass it into tasks run by thread and process pools.
+    """
+    return Span(name, label, echo, parent, **attrs)
+
+
+def current_span():
+    """The innermost span open in this thread, or None"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def start_trace(path):
+    """Start a new JSON lines trace at path; worker processes started later append to it too"""
+    with open(path, 'w', encoding='utf-8'):
+        pass
+    os.environ[TRACE_ENV] = path
+    _trace.update(path=path, file=None, pid=None)
+
+
+def read_trace(path):
+    """Return the span records of a JSON lines trace"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def chrome_trace(records):
+    """Convert span records to a Chrome trace-event document"""
+    events = []
+    for record in records:
+        args = {**record['attrs'], 'process_rss_kb': record['rss_kb']}
+        events.append({
+            'name': record['label'] or record['name'],
+            'cat': record['name'],
+            'ph': 'X',
+            'ts': record['ts'],
+            'dur': record['dur'],
+            'pid': record['pid'],
+            'tid': record['tid'],
+            'args': args,
+        })
+        events.append({
+            'name': 'rss_kb',
+            'ph': 'C',
+            'ts': record['ts'] + record['dur'],
+            'pid': record['pid'],
+            'args': {'rss_kb': record['rss_kb']},
+        })
+    events.sort(key=lambda event: event['ts'])
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(path, output=None):
+    """Write the Chrome trace of a JSON lines trace next to it and return its path"""
+    output = output or os.path.splitext(path)[0] + '.json'
+    if output == path:
+        output = path + '.chrome.json'
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(read_trace(path)), f, ensure_ascii=False)
+    return output
+
+
+def trace_summary(records, limit=SUMMARY_SPANS):
+    """Format the slowest slide, section, fetch, optimize and save spans"""
+    leaves = [r for r in records if r['name'] not in CONTAINER_SPANS]
+    lines = ["", "=== Slowest spans ===", ""]
+    for record in sorted(leaves, key=lambda r: -r['dur'])[:limit]:
+        label = f"{record['name']}: {record['label'] or ''}"
+        lines.append(f"  {label[:52]:<52} {record['dur'] / 1000:9.1f} ms")
+    return "\n".join(lines) + "\n"
+
+
+def finish_trace():
+    """Close this process's trace, write its Chrome version and return a printable summary"""
+    path = _trace['path']
+    with _lock:
+        if _trace['file'] is not None:
+            _trace['file'].close()
+            _trace['file'] = None
+    chrome_path = write_chrome_trace(path)
+    return (trace_summary(read_trace(path))
+            + f"\nTrace written to {path} (JSON lines) and {chrome_path} (Chrome trace)\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    chrome_parser = subparsers.add_parser('chrome', help='convert a JSON lines trace to Chrome format')
+    chrome_parser.add_argument('trace', help='JSON lines trace file')
+    chrome_parser.add_argument('output', nargs='?', help='Chrome trace file to write')
+    summary_parser = subparsers.add_parser('summary', help='print the slowest spans of a trace')
+    summary_parser.add_argument('trace', help='JSON lines trace file')
+    summary_parser.add_argument('--limit', type=int, default=SUMMARY_SPANS, help='spans to list')
+    args = parser.parse_args(argv)
+
+    if args.command == 'chrome':
+        print(f"Chrome trace written to {write_chrome_trace(args.trace, args.output)}")
+    else:
+        print(trace_summary(read_trace(args.trace), args.limit))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Deck variants patched straight into a base package's slide XML instead of re-rendered
+
+A variants file is a JSON list of:
+
+    {
+        "id": "verde",                                  file-name slug, required
+        "colors": {"primary": "#0B6E4F"},               DECK_COLORS roles to recolor
+        "replace": {"contato@theflow.com": "..."}       text substituted inside text runs
+    }
+
+Only slide and slide layout parts (the layouts carry the backgrounds and text colors) whose
+bytes change are rewritten; every other part, media included, is copied from the base package
+without being decompressed.
+"""
+
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape, unescape
+
+from deck_spec import DECK_COLORS
+from theflow_brands import BRAND_ID_PATTERN, parse_color
+from theflow_trace import current_span, span
+from theflow_zip import PackageWriter, read_raw, zip_level
+
+VARIANT_FILENAME = 'TheFlow_Apresentacao_Comercial_{id}.pptx'
+VARIANT_FIELDS = {'id', 'colors', 'replace'}
+SLIDE_PART = re.compile(r'^ppt/(slides/slide|slideLayouts/slideLayout)\d+\.xml$')
+SRGB_COLOR = re.compile(rb'(<a:srgbClr val=")([0-9A-Fa-f]{6})(")')
+TEXT_RUN = re.compile(rb'(<a:t>)([^<]*)(</a:t>)')
+MAX_PARALLEL_VARIANTS = 4
+
+
+def _hex(rgb):
+    return '%02X%02X%02X' % tuple(rgb)
+
+
+def load_variants(path):
+    """Read and validate a variants file"""
+    with open(path, encoding='utf-8') as f:
+        variants = json.load(f)
+    if not isinstance(variants, list):
+        raise ValueError(f"{path}: expected a JSON list of variants")
+    for i, variant in enumerate(variants):
+        where = f"{path}: variant #{i + 1}"
+        if not isinstance(variant, dict):
+            raise ValueError(f"{where}: expected a JSON object, got {type(variant).__name__}")
+        if not isinstance(variant.get('id'), str) or not BRAND_ID_PATTERN.match(variant['id']):
+            raise ValueError(f"{where}: 'id' must be a slug of letters, digits, '-' or '_'")
+        where = f"{path}: variant #{i + 1} ({variant['id']})"
+        unknown = sorted(set(variant) - VARIANT_FIELDS)
+        if unknown:
+            raise ValueError(f"{where}: unknown fields {', '.join(unknown)}")
+        if not isinstance(variant.get('colors', {}), dict):
+            raise ValueError(f"{where}: 'colors' must be an object of role: color")
+        unknown = sorted(set(variant.get('colors', {})) - set(DECK_COLORS))
+        if unknown:
+            raise ValueError(f"{where}: unknown color roles {', '.join(unknown)}")
+        replace = variant.get('replace', {})
+        if not isinstance(replace, dict) or not all(
+                isinstance(old, str) and isinstance(new, str) for old, new in replace.items()):
+            raise ValueError(f"{where}: 'replace' must be an object of text: replacement strings")
+        colors = {}
+        for role, value in variant.get('colors', {}).items():
+            try:
+                colors[role] = parse_color(value)
+            except ValueError as e:
+                raise ValueError(f"{where}: colors.{role}: {e}") from None
+        variant['colors'] = colors
+    return variants
+
+
+def color_map(colors, base_colors=DECK_COLORS):
+    """Map base hex values to the variant's, e.g. {b'003399': b'0B6E4F'}"""
+    mapping = {}
+    for role, rgb in colors.items():
+        old, new = _hex(base_colors[role]).encode('ascii'), _hex(rgb).encode('ascii')
+        if mapping.get(old, new) != new:
+            raise ValueError(f"Color roles sharing {old.decode()} in the base deck cannot be "
+                             f"recolored separately; render the variant instead")
+        mapping[old] = new
+    return {old: new for old, new in mapping.items() if old != new}
+
+
+def patch_slide(xml, colors, replace, used):
+    """Recolor and substitute text in one slide's XML; record which replacements matched"""
+    if colors:
+        xml = SRGB_COLOR.sub(lambda m: m[1] + colors.get(m[2].upper(), m[2]) + m[3], xml)
+    if replace:
+        def substitute(match):
+            text = unescape(match[2].decode('utf-8'))
+            for old, new in replace.items():
+                if old in text:
+                    used.add(old)
+                    text = text.replace(old, new)
+            return match[1] + escape(text).encode('utf-8') + match[3]
+        xml = TEXT_RUN.sub(substitute, xml)
+    return xml
+
+
+def build_variant(base_path, variant, filename, base_colors=DECK_COLORS, parent=None):
+    """Write a variant of base_path, rewriting only the slide and layout parts it changes"""
+    colors = color_map(variant.get('colors', {}), base_colors)
+    replace = variant.get('replace', {})
+    used, patched = set(), 0
+    level = zip_level()
+    try:
+        with span('save', filename, parent=parent) as s, zipfile.ZipFile(base_path) as src, \
+                open(base_path, 'rb') as raw_file, PackageWriter(filename) as out:
+            for info in src.infolist():
+                if (colors or replace) and SLIDE_PART.match(info.filename):
+                    xml = src.read(info)
+                    new_xml = patch_slide(xml, colors, replace, used)
+                    if new_xml != xml:
+                        out.writestr(info.filename, new_xml, level=level, date_time=info.date_time)
+                        patched += 1
+                        continue
+                out.copy(info, read_raw(raw_file, info))
+            s.set(patched_parts=patched)
+    except BaseException:
+        # Never leave a truncated package behind under the variant's name
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+
+    for old in sorted(set(replace) - used):
+        print(f"Warning: variant {variant['id']}: no slide text contains {old!r}")
+    print(f"Created variant {variant['id']} ({patched} parts patched)")
+    return filename
+
+
+def build_variants(base_path, variants, output_dir, base_colors=DECK_COLORS,
+                   max_workers=MAX_PARALLEL_VARIANTS):
+    """Build every variant from one base package, concurrently; returns [(id, filename)]"""
+    # Copying and deflating release the GIL, so threads overlap the I/O and zlib work
+    parent = current_span()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(variants)) or 1) as pool:
+        futures = [
+            (variant['id'], pool.submit(
+                build_variant, base_path, variant,
+                os.path.join(output_dir, VARIANT_FILENAME.format(id=variant['id'])), base_colors,
+                parent,
+            ))
+            for variant in variants
+        ]
+        return [(variant_id, future.result()) for variant_id, future in futures]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Per-lesson student workbooks: spec sections built from english_content.json and streamed to Word
+
+Each workbook holds the lesson's vocabulary, phrases and example sentences, every exercise with
+space to answer, the speaking prompts and, after a page break, the answer key. A manifest next to
+the workbooks records each lesson's fingerprint so unchanged lessons are skipped.
+"""
+
+import json
+import os
+import tempfile
+
+from theflow_build import run_jobs
+from theflow_content import VOCABULARY_HEADER, vocabulary_rows
+from theflow_parts import WORKBOOK_SOURCES, fingerprint, renderer_digest
+from theflow_startup import timed_import
+from theflow_zip import build_time, deterministic, zip_level
+
+WORKBOOK_FILENAME = 'TheFlow_Caderno_Licao_{number:02d}.docx'
+WORKBOOK_MANIFEST = 'workbooks_manifest.json'
+
+EXERCISE_TITLES = {
+    'fill_in_blank': 'Complete as lacunas',
+    'translation': 'Tradução',
+    'unscramble': 'Ordene as palavras',
+    'substitution': 'Substituição',
+    'completion': 'Complete as frases',
+}
+ANSWER_LINE = 'R: ' + '_' * 60
+
+
+def _answer_text(question):
+    answer = question.get('answer')
+    if answer is None and question.get('alternatives'):
+        return 'Sugestões: ' + ', '.join(question['alternatives'])
+    if isinstance(answer, list):
+        return ' / '.join(answer)
+    return answer or '-'
+
+
+def _question_text(number, question):
+    text = f"{number}. {question['question']}"
+    if question.get('word_to_replace'):
+        text += f" (substitua: {question['word_to_replace']})"
+    if question.get('options'):
+        text += f" (opções: {', '.join(question['options'])})"
+    return text
+
+
+def _exercise_title(i, exercise):
+    return f"Exercício {i}: {EXERCISE_TITLES.get(exercise['type'], exercise['type'])}"
+
+
+def workbook_sections(lesson):
+    """Return the spec sections of one lesson's workbook"""
+    number, title = lesson['lesson_number'], lesson['title']
+    sections = [{
+        'label': f"Lesson {number} cover",
+        'blocks': [
+            ('title', 'THE FLOW ENGLISH TRAINER'),
+            ('centered', 'CADERNO DO ALUNO', 18, True),
+            ('centered', f"Lição {number}: {title}", 16, True),
+            ('centered', f"Nível: {lesson.get('difficulty', '-')}"),
+            ('paragraph', ''),
+            ('centered', 'Nome: ______________________________   Data: ____/____/________'),
+        ],
+    }]
+
+    study = []
+    if lesson.get('vocabulary'):
+        study += [('heading', 'Vocabulário', 1),
+                  ('table', VOCABULARY_HEADER, vocabulary_rows(lesson['vocabulary']),
+                   [2, 1.2, 4, 2.5])]
+    if lesson.get('phrases'):
+        study += [('heading', 'Frases', 1),
+                  ('table', ['Frase', 'Tradução', 'Contexto'], [
+                      [item['phrase'], item.get('translation', ''), item.get('context', '')]
+                      for item in lesson['phrases']
+                  ], [3, 3, 2])]
+    if lesson.get('example_sentences'):
+        study += [('heading', 'Frases de Exemplo', 1),
+                  ('table', ['Inglês', 'Português'], [
+                      [item['sentence'], item.get('translation', '')]
+                      for item in lesson['example_sentences']
+                  ])]
+    if study:
+        sections.append({'label': f"Lesson {number} study", 'blocks': study})
+
+    exercises = lesson.get('exercises', [])
+    practice = []
+    if exercises:
+        practice.append(('heading', 'Exercícios', 1))
+    for i, exercise in enumerate(exercises, 1):
+        practice += [('heading', _exercise_title(i, exercise), 2),
+                     ('paragraph', exercise.get('instructions', ''))]
+        for n, question in enumerate(exercise['questions'], 1):
+            practice += [('paragraph', _question_text(n, question)), ('paragraph', ANSWER_LINE)]
+    if lesson.get('speaking_prompts'):
+        practice += [('heading', 'Prática Oral', 1),
+                     ('paragraph', 'Responda em voz alta, com frases completas:'),
+                     ('bullets', lesson['speaking_prompts'])]
+    if practice:
+        sections.append({'label': f"Lesson {number} exercises", 'blocks': practice})
+
+    if exercises:
+        key = [('heading', 'Gabarito', 1)]
+        for i, exercise in enumerate(exercises, 1):
+            key.append(('heading', _exercise_title(i, exercise), 2))
+            key += [('paragraph', f"{n}. {_answer_text(question)}")
+                    for n, question in enumerate(exercise['questions'], 1)]
+        sections.append({'label': f"Lesson {number} answer key", 'blocks': key})
+    return sections
+
+
+def workbook_fingerprint(lesson, renderer):
+    """Fingerprint a lesson's workbook from its content, the renderer sources and the zip settings"""
+    # Only deterministic builds have a fixed time stamp; others keep the one they were built with
+    stamp = build_time().isoformat() if deterministic() else None
+    return fingerprint(renderer, [lesson, zip_level(), stamp])
+
+
+def build_workbook(lesson, filename):
+    """Stream one lesson's workbook to filename"""
+    from theflow_docx_stream import StreamingDocument
+
+    with StreamingDocument(filename) as doc:
+        doc.write_sections(workbook_sections(lesson))
+    return filename
+
+
+def _init_worker():
+    """Pool initializer: import python-docx once per worker"""
+    timed_import('docx')
+
+
+def load_manifest(output_dir):
+    """Read the workbook manifest, or start an empty one"""
+    try:
+        with open(os.path.join(output_dir, WORKBOOK_MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    """Write the workbook manifest atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, os.path.join(output_dir, WORKBOOK_MANIFEST))
+
+
+def build_workbooks(lessons, output_dir, max_workers=None, force=False, prune=True):
+    """Build the workbooks whose lesson changed since the last run; returns (built, skipped)
+
+    With prune, workbooks of lessons missing from lessons are deleted; pass prune=False when
+    building a subset of the corpus.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    renderer = renderer_digest(*(os.path.join(base_dir, name) for name in WORKBOOK_SOURCES))
+    manifest = load_manifest(output_dir)
+
+    jobs, fingerprints, skipped = [], {}, []
+    for lesson in lessons:
+        key = str(lesson['lesson_number'])
+        filename = WORKBOOK_FILENAME.format(number=lesson['lesson_number'])
+        fingerprints[key] = workbook_fingerprint(lesson, renderer)
+        entry = manifest.get(key)
+        if (not force and entry and entry['fingerprint'] == fingerprints[key]
+                and os.path.exists(os.path.join(output_dir, entry['file']))):
+            skipped.append(key)
+            continue
+        jobs.append((key, build_workbook, (lesson, os.path.join(output_dir, filename))))
+
+    for key in sorted(set(manifest) - set(fingerprints) if prune else ()):
+        stale = os.path.join(output_dir, manifest.pop(key)['file'])
+        if os.path.exists(stale):
+            os.remove(stale)
+            print(f"Removed stale workbook {stale}")
+
+    built = run_jobs(jobs, max_workers, initializer=_init_worker) if jobs else []
+    for key, filename, _ in built:
+        manifest[key] = {'fingerprint': fingerprints[key], 'file': os.path.basename(filename)}
+    save_manifest(output_dir, manifest)
+    return built, skipped
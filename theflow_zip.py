@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Minimal zip package writer that can copy entries from another zip without recompressing them
+
+save_package() writes python-pptx and python-docx documents through it: media that is already
+compressed (PNG, JPEG, ...) is stored as is, and the XML parts are deflated in parallel threads
+(zlib releases the GIL) at a tunable level.
+
+Packages carry their build time in the zip entries and the core properties. For reproducible
+output set SOURCE_DATE_EPOCH, or THEFLOW_DETERMINISTIC=1 (--deterministic) to pin every timestamp
+to 1980-01-01: entries are written in the library's fixed order, so an unchanged build then
+produces byte-identical files.
+"""
+
+import os
+import re
+import struct
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_OF_CENTRAL_DIR = struct.Struct('<IHHHHIIH')
+LOCAL_HEADER_SIGNATURE = 0x04034b50
+CENTRAL_HEADER_SIGNATURE = 0x02014b50
+END_OF_CENTRAL_DIR_SIGNATURE = 0x06054b50
+
+ZIP_VERSION = 20
+UTF8_FLAG = 0x800
+ZIP32_LIMIT = 0xFFFFFFFF
+ZIP32_MAX_ENTRIES = 0xFFFF
+
+DEFAULT_LEVEL = 6
+
+# Deflate level for saved packages, 0 (store, fastest) to 9 (smallest) (THEFLOW_ZIP_LEVEL)
+ZIP_LEVEL_ENV = 'THEFLOW_ZIP_LEVEL'
+MAX_PARALLEL_COMPRESS = 4
+
+# Reproducible builds (https://reproducible-builds.org/specs/source-date-epoch/)
+SOURCE_DATE_EPOCH_ENV = 'SOURCE_DATE_EPOCH'
+DETERMINISTIC_ENV = 'THEFLOW_DETERMINISTIC'
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+CORE_PROPERTIES_PART = 'docProps/core.xml'
+CORE_DATES = re.compile(rb'(<dcterms:(created|modified)\b[^>]*>)[^<]*(</dcterms:\2>)')
+LAST_MODIFIED_BY = re.compile(rb'<cp:lastModifiedBy\s*/>|<cp:lastModifiedBy>[^<]*</cp:lastModifiedBy>')
+
+# Parts in these formats are compressed already; deflating them again costs time for no gain
+STORED_EXTENSIONS = frozenset((
+    '.png', '.jpg', '.jpeg', '.jpe', '.jfif', '.gif', '.tif', '.tiff', '.wdp', '.mp3', '.m4a',
+    '.mp4', '.m4v', '.mov', '.wmv', '.zip',
+))
+
+
+def read_raw(fp, info):
+    """Return the still-compressed bytes of a ZipInfo entry from an open binary file"""
+    fp.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(fp.read(LOCAL_HEADER.size))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_length, extra_length = header[9], header[10]
+    fp.seek(name_length + extra_length, 1)
+    return fp.read(info.compress_size)
+
+
+def zip_level():
+    """Deflate level for saved packages: THEFLOW_ZIP_LEVEL if set, else DEFAULT_LEVEL"""
+    level = int(os.environ.get(ZIP_LEVEL_ENV, DEFAULT_LEVEL))
+    if not 0 <= level <= 9:
+        raise ValueError(f"{ZIP_LEVEL_ENV} must be between 0 and 9, not {level}")
+    return level
+
+
+def set_zip_level(level):
+    """Save packages at level from now on, in this process and in workers started later"""
+    if not 0 <= level <= 9:
+        raise ValueError(f"zip level must be between 0 and 9, not {level}")
+    os.environ[ZIP_LEVEL_ENV] = str(level)
+
+
+def deterministic():
+    """True when saved packages must not depend on when they were built"""
+    return bool(os.environ.get(SOURCE_DATE_EPOCH_ENV) or os.environ.get(DETERMINISTIC_ENV))
+
+
+def set_deterministic():
+    """Make packages saved from now on reproducible, in this process and in workers started later"""
+    os.environ[DETERMINISTIC_ENV] = '1'
+
+
+def build_time():
+    """UTC time stamped on saved packages: SOURCE_DATE_EPOCH, ZIP_EPOCH when deterministic, else now"""
+    epoch = os.environ.get(SOURCE_DATE_EPOCH_ENV)
+    if epoch:
+        # Zip dates cannot go back further than 1980
+        return max(datetime.fromtimestamp(int(epoch), timezone.utc).replace(tzinfo=None), ZIP_EPOCH)
+    if os.environ.get(DETERMINISTIC_ENV):
+        return ZIP_EPOCH
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def stamp_core_properties(xml, when):
+    """Return docProps/core.xml with created and modified set to when and no last editor
+
+    The libraries' templates ship fixed 2013 dates and their author's name here.
+    """
+    stamp = when.strftime('%Y-%m-%dT%H:%M:%SZ').encode()
+    xml = CORE_DATES.sub(lambda m: m.group(1) + stamp + m.group(3), xml)
+    return LAST_MODIFIED_BY.sub(b'<cp:lastModifiedBy/>', xml)
+
+
+def deflate(data, level=DEFAULT_LEVEL):
+    """Raw-deflate data as stored in a zip entry"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _dos_datetime(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+class PackageWriter:
+    """Write zip entries sequentially; use as a context manager"""
+
+    def __init__(self, file):
+        self._own = isinstance(file, (str, bytes, os.PathLike))
+        self.fp = open(file, 'wb') if self._own else file
+        self.entries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._own:
+            self.fp.close()
+
+    def _write_entry(self, name, raw, crc, size, compress_type, date_time, external_attr=0):
+        if len(raw) > ZIP32_LIMIT or size > ZIP32_LIMIT:
+            raise zipfile.LargeZipFile(f"{name} needs zip64, which this writer does not produce")
+        encoded = name.encode('utf-8')
+        flags = 0 if encoded.isascii() else UTF8_FLAG
+        dos_time, dos_date = _dos_datetime(date_time)
+        offset = self.fp.tell()
+        self.fp.write(LOCAL_HEADER.pack(
+            LOCAL_HEADER_SIGNATURE, ZIP_VERSION, flags, compress_type, dos_time, dos_date,
+            crc, len(raw), size, len(encoded), 0,
+        ))
+        self.fp.write(encoded)
+        self.fp.write(raw)
+        self.entries.append((encoded, flags, compress_type, dos_time, dos_date, crc, len(raw),
+                             size, external_attr, offset))
+
+    def copy(self, info, raw):
+        """Append an entry read with read_raw(), keeping its compressed bytes as they are"""
+        self._write_entry(info.filename, raw, info.CRC, info.file_size, info.compress_type,
+                          info.date_time, info.external_attr)
+
+    def writestr(self, name, data, compress_type=zipfile.ZIP_DEFLATED, level=DEFAULT_LEVEL,
+                 date_time=(1980, 1, 1, 0, 0, 0), raw=None):
+        """Append an entry from bytes, deflated unless compress_type is ZIP_STORED
+
+        raw is data already deflated with deflate(), e.g. by another thread.
+        """
+        if compress_type == zipfile.ZIP_DEFLATED:
+            raw = deflate(data, level) if raw is None else raw
+        else:
+            raw = data
+        self._write_entry(name, raw, zlib.crc32(data), len(data), compress_type, date_time)
+
+    def close(self):
+        """Write the central directory and close the file if this writer opened it"""
+        if len(self.entries) > ZIP32_MAX_ENTRIES:
+            raise zipfile.LargeZipFile("Too many entries for a zip without zip64")
+        start = self.fp.tell()
+        for encoded, flags, compress_type, dos_time, dos_date, crc, compress_size, size, \
+                external_attr, offset in self.entries:
+            self.fp.write(CENTRAL_HEADER.pack(
+                CENTRAL_HEADER_SIGNATURE, ZIP_VERSION, ZIP_VERSION, flags, compress_type,
+                dos_time, dos_date, crc, compress_size, size, len(encoded), 0, 0, 0, 0,
+                external_attr, offset,
+            ))
+            self.fp.write(encoded)
+        end = self.fp.tell()
+        self.fp.write(END_OF_CENTRAL_DIR.pack(
+            END_OF_CENTRAL_DIR_SIGNATURE, 0, 0, len(self.entries), len(self.entries),
+            end - start, start, 0,
+        ))
+        if self._own:
+            self.fp.close()
+
+
+class _PartCollector:
+    """Stands in for the libraries' zip writer and records (member name, bytes) in save order"""
+
+    def __init__(self):
+        self.items = []
+
+    def write(self, pack_uri, blob):
+        self.items.append((pack_uri.membername, blob))
+
+
+def package_items(document):
+    """Return [(member name, bytes)] of a python-pptx Presentation or python-docx Document
+
+    The parts come from the library's own package writer, in the order and with the content
+    types and relationships that document.save() would write.
+    """
+    collector = _PartCollector()
+    package = document.part.package
+    if type(package).__module__.startswith('pptx'):
+        from pptx.opc.serialized import PackageWriter as PptxWriter
+
+        writer = PptxWriter(None, package._rels, tuple(package.iter_parts()))
+        writer._write_content_types_stream(collector)
+        writer._write_pkg_rels(collector)
+        writer._write_parts(collector)
+    else:
+        from docx.opc.pkgwriter import PackageWriter as DocxWriter
+
+        parts = package.parts
+        for part in parts:
+            part.before_marshal()
+        DocxWriter._write_content_types_stream(collector, parts)
+        DocxWriter._write_pkg_rels(collector, package.rels)
+        DocxWriter._write_parts(collector, parts)
+    return collector.items
+
+
+def save_package(document, file, level=None, max_workers=MAX_PARALLEL_COMPRESS):
+    """Save a python-pptx or python-docx document to a path or binary file
+
+    Already-compressed media is stored and every other part deflated at level (default:
+    zip_level()), in parallel threads. Entries and core properties are dated build_time().
+    """
+    level = zip_level() if level is None else level
+    when = build_time()
+    date_time = when.timetuple()[:6]
+    items = [(name, stamp_core_properties(data, when) if name == CORE_PROPERTIES_PART else data)
+             for name, data in package_items(document)]
+    stored = [level == 0 or os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+              for name, _ in items]
+    to_deflate = [data for (_, data), store in zip(items, stored) if not store]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_deflate)))) as pool:
+        deflated = iter(pool.map(lambda data: deflate(data, level), to_deflate))
+        with PackageWriter(file) as out:
+            for (name, data), store in zip(items, stored):
+                if store:
+                    out.writestr(name, data, zipfile.ZIP_STORED, date_time=date_time)
+                else:
+                    out.writestr(name, data, date_time=date_time, raw=next(deflated))